@@ -1,12 +1,12 @@
 import streamlit as st
-import pandas as pd
-import requests
-from datetime import datetime
+
+from velibstat import cached, debug, maps, pipelines
 
 # ----------------------------------------------------
 # Configuration Streamlit
 # ----------------------------------------------------
 st.set_page_config(page_title="Vélibstat", layout="wide")
+debug.start_page()
 st.title("Vélibstat 🚲")
 
 # ----------------------------------------------------
@@ -30,67 +30,38 @@ st.sidebar.title("🚲 Vélibstat")
 st.sidebar.caption("Créé par [Nicolas](https://www.linkedin.com/in/nicolas-bouttier/)")
 
 # ----------------------------------------------------
-# Récupération des données station_status.json
+# Données station_status.json / station_information.json
 # ----------------------------------------------------
-URL_status = "https://velib-metropole-opendata.smovengo.cloud/opendata/Velib_Metropole/station_status.json"
-response = requests.get(URL_status)
-data = response.json()
-stations = data["data"]["stations"]
-df = pd.DataFrame(stations)
-
-# Extraction vélos mécaniques / électriques
-def extract_bike_types(x):
-    if isinstance(x, list) and len(x) > 0 and isinstance(x[0], dict):
-        return {
-            "vélo_mécanique_disponible": x[0].get("mechanical", None),
-            "vélo_électrique_disponible": x[1].get("ebike", None),
-        }
-    return {"vélo_mécanique_disponible": None, "vélo_électrique_disponible": None}
-
-bike_types_df = df["num_bikes_available_types"].apply(extract_bike_types).apply(pd.Series)
-df = pd.concat([df.drop(columns=["num_bikes_available_types"]), bike_types_df], axis=1)
-df = df.drop(columns=["station_opening_hours","numBikesAvailable","numDocksAvailable"])
+home = pipelines.home(cached.live_stations())
+totals = home.totals
 
-# Statistiques principales
-nb_bikes_available = df["num_bikes_available"].sum()
-nb_mechanical_available = df["vélo_mécanique_disponible"].sum()
-nb_ebike_available = df["vélo_électrique_disponible"].sum()
-nb_docks_available = df["num_docks_available"].sum()
-nb_stations = df["station_id"].nunique()
-nb_stations_available = df.loc[df["is_installed"] == 1, "station_id"].nunique()
-refresh = datetime.fromtimestamp(data["lastUpdatedOther"])
-
-# ----------------------------------------------------
-# Récupération des données station_information.json
-# ----------------------------------------------------
-URL_info = "https://velib-metropole-opendata.smovengo.cloud/opendata/Velib_Metropole/station_information.json"
-response_info = requests.get(URL_info)
-data_info = response_info.json()
-stations_info = data_info["data"]["stations"]
-df_info = pd.DataFrame(stations_info)
-df_info = df_info.drop(columns=["station_opening_hours","rental_methods"])
-capacité_totale = df_info["capacity"].sum()
+df = home.live.status.rename(columns={
+    "mechanical_available": "vélo_mécanique_disponible",
+    "ebike_available": "vélo_électrique_disponible",
+})
+df_info = home.live.info
 
 # ----------------------------------------------------
 # Section indicateurs
 # ----------------------------------------------------
 st.subheader("📊 Indicateurs principaux")
-st.markdown(f"**Dernière mise à jour des données:** {refresh}")
+st.markdown(f"**Dernière mise à jour des données:** {home.live.last_updated}")
 
 cols = st.columns(7)
-cols[0].metric("📍 Nombre total de stations", nb_stations)
-cols[1].metric("🚦 Stations en service", nb_stations_available)
-cols[2].metric("🏋️‍♂️ Nombre total d’emplacements", capacité_totale)
-cols[3].metric("🅿️ Emplacements libres", nb_docks_available)
-cols[4].metric("🚲 Vélos disponibles", nb_bikes_available)
-cols[5].metric("⚙️ Vélos mécaniques", nb_mechanical_available)
-cols[6].metric("🔋 Vélos électriques", nb_ebike_available)
+cols[0].metric("📍 Nombre total de stations", totals.nb_stations)
+cols[1].metric("🚦 Stations en service", totals.nb_stations_available)
+cols[2].metric("🏋️‍♂️ Nombre total d’emplacements", totals.capacity)
+cols[3].metric("🅿️ Emplacements libres", totals.nb_docks_available)
+cols[4].metric("🚲 Vélos disponibles", totals.nb_bikes_available)
+cols[5].metric("⚙️ Vélos mécaniques", totals.nb_mechanical_available)
+cols[6].metric("🔋 Vélos électriques", totals.nb_ebike_available)
 
 # ----------------------------------------------------
 # Section carte
 # ----------------------------------------------------
 st.subheader("🗺️ Carte des stations")
-st.map(df_info, zoom=10)
+st.map(maps.map_layer(home.live.stations, 10), zoom=10, color="color", size="size")
+st.caption(maps.LEGEND, unsafe_allow_html=True)
 
 # ----------------------------------------------------
 # Section tableaux
@@ -103,9 +74,4 @@ with cols_table[0]:
 with cols_table[1]:
     st.dataframe(df_info, use_container_width=True)
 
-
-
-
-
-
-
+debug.debug_panel()
@@ -0,0 +1 @@
+"""Banc de mesure des pipelines Vélibstat (python -m benchmarks.run)."""
@@ -0,0 +1,252 @@
+"""Chemins critiques de chaque page, exécutés sans Streamlit ni réseau.
+
+Chaque cas déclare la page concernée, une fonction `setup(data)` qui prépare
+les arguments à partir des fixtures (hors mesure) et la fonction mesurée.
+"""
+from dataclasses import dataclass
+from datetime import date
+from functools import cached_property
+from typing import Callable
+
+import pandas as pd
+
+from benchmarks import fixtures
+from velibstat import forecast, gbfs, geo, history, hotspots, maps, network, occupancy, pipelines, quality, systems, trips
+
+
+class Data:
+    """Fixtures d'une échelle donnée, générées à la demande."""
+
+    def __init__(self, scale: float, trip_days: int, history_days: int):
+        self.scale = scale
+        self.trip_days = trip_days
+        self.history_days = history_days
+
+    @cached_property
+    def info_payload(self):
+        return fixtures.make_station_information(self.scale)
+
+    @cached_property
+    def status_payload(self):
+        return fixtures.make_station_status(self.info_payload)
+
+    @cached_property
+    def live(self):
+        return pipelines.live_stations(self.status_payload, self.info_payload)
+
+    @cached_property
+    def df_status(self):
+        return self.live.status
+
+    @cached_property
+    def df_info(self):
+        return self.live.info
+
+    @cached_property
+    def df_stations(self):
+        return self.live.stations
+
+    @cached_property
+    def communes(self):
+        return geo.load_communes()[0]
+
+    @cached_property
+    def df_located(self):
+        return pipelines.locate(self.df_stations, self.communes)
+
+    @cached_property
+    def df_trips(self):
+        return fixtures.make_trips(self.info_payload, days=self.trip_days)
+
+    @cached_property
+    def df_dim_station(self):
+        return fixtures.make_dim_station(self.info_payload)
+
+    @cached_property
+    def df_history(self):
+        return fixtures.make_station_status_history(self.info_payload, days=self.history_days)
+
+    @cached_property
+    def station_labels(self):
+        return pipelines.station_labels(self.df_stations)
+
+    @cached_property
+    def history_freq(self):
+        # Même grille que la comparaison de stations de Station.py
+        return "15min" if self.history_days <= 1 else "1h"
+
+    @cached_property
+    def df_history_hourly(self):
+        # Même agrégation que la requête d'entraînement de Station.py
+        h = self.df_history
+        nb_available = h["nb_bike"] + h["nb_ebike"]
+        return (
+            pd.DataFrame({
+                "station_id": h["station_id"],
+                "file_date": h["file_date"].dt.floor("h"),
+                "nb_available": nb_available,
+                "has_bike": (nb_available > 0).astype(float),
+            })
+            .groupby(["station_id", "file_date"], as_index=False)
+            .mean()
+        )
+
+    @cached_property
+    def df_live(self):
+        return pipelines.rebalancing_stations(self.live)
+
+    @cached_property
+    def snapshot_counts(self):
+        h = self.df_history
+        return (
+            h.assign(nb_available=h["nb_bike"] + h["nb_ebike"])
+            .groupby(["station_id", "nb_available"])
+            .size()
+            .reset_index(name="nb_snapshots")
+        )
+
+    @cached_property
+    def flows(self):
+        t = self.df_trips
+        out = t.groupby("start_station_id").size().rename("nb_out")
+        in_ = t.groupby("end_station_id").size().rename("nb_in")
+        return pd.concat([in_, out], axis=1).fillna(0).rename_axis("station_id").reset_index()
+
+    @cached_property
+    def hotspot_state(self):
+        capacity = self.df_live.set_index("station_id")["capacity"]
+        return hotspots.init_state(self.snapshot_counts, capacity, self.history_days, int(self.live.last_updated.timestamp()))
+
+    @cached_property
+    def occupancy_tensor(self):
+        return occupancy.update(occupancy.empty(), self.df_history_hourly, date.today())
+
+    @cached_property
+    def forecast_model(self):
+        return forecast.train(self.df_history_hourly)
+
+    @cached_property
+    def system_payloads(self):
+        # Le même réseau pour chaque système du registre intégré
+        feeds = {"station_status": self.status_payload, "station_information": self.info_payload}
+        return {system_id: feeds for system_id in systems.SYSTEMS}
+
+
+@dataclass
+class Case:
+    name: str
+    page: str
+    setup: Callable
+    run: Callable
+
+
+def input_rows(args) -> int:
+    """Taille de la plus grande entrée (lignes ou stations)."""
+    sizes = [0]
+    for arg in args:
+        if isinstance(arg, (pd.DataFrame, pd.Series)):
+            sizes.append(len(arg))
+        elif isinstance(arg, dict) and "data" in arg:
+            sizes.append(len(arg["data"]["stations"]))
+        elif isinstance(arg, dict) and all(isinstance(feeds, dict) and "station_status" in feeds for feeds in arg.values()):
+            # Flux de plusieurs systèmes : stations cumulées
+            sizes.append(sum(len(feeds["station_status"]["data"]["stations"]) for feeds in arg.values()))
+        elif isinstance(getattr(arg, "stations", None), pd.DataFrame):
+            sizes.append(len(arg.stations))
+    return max(sizes)
+
+
+CASES = [
+    # Home.py
+    Case("gbfs.normalize_status", "Home", lambda d: (d.status_payload,), gbfs.normalize_status),
+    Case("gbfs.normalize_information", "Home", lambda d: (d.info_payload,), gbfs.normalize_information),
+    Case("network.network_totals", "Home", lambda d: (d.df_status, d.df_info), network.network_totals),
+    Case("pipelines.live_stations", "Home", lambda d: (d.status_payload, d.info_payload), pipelines.live_stations),
+    Case("pipelines.home", "Home", lambda d: (d.live,), pipelines.home),
+    Case("maps.map_layer", "Home", lambda d: (d.df_stations, 10), maps.map_layer),
+    # Station.py
+    Case("gbfs.merge_status_information", "Station", lambda d: (d.df_status, d.df_info), gbfs.merge_status_information),
+    Case(
+        "pipelines.station_forecasts", "Station",
+        lambda d: (d.forecast_model, d.df_stations, pd.Timestamp.now(tz="UTC"), 30),
+        pipelines.station_forecasts,
+    ),
+    Case(
+        "history.align_histories", "Station",
+        lambda d: (d.df_history, "nb_bike", d.station_labels, d.history_freq),
+        history.align_histories,
+    ),
+    Case(
+        "pipelines.station_comparison", "Station",
+        lambda d: (d.df_history, d.station_labels, d.history_freq),
+        pipelines.station_comparison,
+    ),
+    Case("forecast.train", "Station", lambda d: (d.df_history_hourly,), forecast.train),
+    Case(
+        "forecast.predict", "Station",
+        lambda d: (d.forecast_model, d.df_live["station_id"], d.df_live["num_bikes_available"], pd.Timestamp.now(tz="UTC")),
+        forecast.predict,
+    ),
+    # Occupancy.py
+    Case("occupancy.update", "Occupancy", lambda d: (d.occupancy_tensor, d.df_history_hourly, date.today()), occupancy.update),
+    Case("pipelines.occupancy_heatmap", "Occupancy", lambda d: (d.occupancy_tensor, d.df_stations), pipelines.occupancy_heatmap),
+    # Ville.py
+    Case("geo.load_communes", "Ville", lambda d: (), geo.load_communes),
+    Case(
+        "geo.locate_stations", "Ville",
+        lambda d: (d.df_stations, d.communes),
+        lambda df, communes: geo.locate_stations(df["lon"], df["lat"], communes),
+    ),
+    Case("network.departement_metrics", "Ville", lambda d: (d.df_located,), network.departement_metrics),
+    Case("pipelines.ville", "Ville", lambda d: (d.live, d.communes), pipelines.ville),
+    # Generic_stats.py
+    Case("trips.filter_period", "Generic_stats", lambda d: (d.df_trips, 7), trips.filter_period),
+    Case("trips.bike_counts", "Generic_stats", lambda d: (d.df_trips,), trips.bike_counts),
+    Case("trips.longest_trip", "Generic_stats", lambda d: (d.df_trips,), trips.longest_trip),
+    Case("trips.station_activity", "Generic_stats", lambda d: (d.df_trips,), trips.station_activity),
+    Case("trips.daily_by_type", "Generic_stats", lambda d: (d.df_trips,), trips.daily_by_type),
+    Case("trips.type_comparison", "Generic_stats", lambda d: (d.df_trips,), trips.type_comparison),
+    Case("trips.hourly_profile", "Generic_stats", lambda d: (d.df_trips,), trips.hourly_profile),
+    Case("trips.duration_distribution", "Generic_stats", lambda d: (d.df_trips,), trips.duration_distribution),
+    Case("trips.station_pairs", "Generic_stats", lambda d: (d.df_trips,), trips.station_pairs),
+    Case("pipelines.trip_dashboard", "Generic_stats", lambda d: (d.df_trips, 7), pipelines.trip_dashboard),
+    Case("quality.flag_trips", "Generic_stats", lambda d: (d.df_trips,), quality.flag_trips),
+    Case(
+        "pipelines.trip_dashboard (nettoyé)", "Generic_stats",
+        lambda d: (d.df_trips, 7, None, quality.flag_trips(d.df_trips)),
+        pipelines.trip_dashboard,
+    ),
+    # TopVelib.py
+    Case(
+        "trips.add_station_coordinates", "TopVelib",
+        lambda d: (d.df_trips.drop(columns=["start_station_name", "end_station_name"]), d.df_dim_station),
+        trips.add_station_coordinates,
+    ),
+    Case(
+        "pipelines.top_velib", "TopVelib",
+        lambda d: (d.df_trips.drop(columns=["start_station_name", "end_station_name"]), d.df_dim_station),
+        pipelines.top_velib,
+    ),
+    # Rebalancing.py
+    Case(
+        "hotspots.init_state", "Rebalancing",
+        lambda d: (
+            d.snapshot_counts, d.df_live.set_index("station_id")["capacity"],
+            d.history_days, int(d.live.last_updated.timestamp()),
+        ),
+        hotspots.init_state,
+    ),
+    Case(
+        "hotspots.update_state", "Rebalancing",
+        lambda d: (d.hotspot_state, d.df_live, d.hotspot_state.last_updated + 60),
+        hotspots.update_state,
+    ),
+    Case(
+        "hotspots.rank_hotspots", "Rebalancing",
+        lambda d: (d.hotspot_state, d.df_live, d.flows, d.trip_days),
+        hotspots.rank_hotspots,
+    ),
+    Case("pipelines.rebalancing_stations", "Rebalancing", lambda d: (d.live,), pipelines.rebalancing_stations),
+    # Systems.py
+    Case("pipelines.systems", "Systems", lambda d: (d.system_payloads, systems.SYSTEMS), pipelines.systems),
+]
@@ -0,0 +1,147 @@
+"""Générateurs de données synthétiques au format des sources Vélibstat.
+
+Tailles exprimées en multiples du réseau Vélib (`scale=1` ≈ 1 500 stations),
+pour mesurer les pages à 1×, 10× ou 100× la taille réelle.
+"""
+import numpy as np
+import pandas as pd
+
+NETWORK_STATIONS = 1500
+TRIPS_PER_STATION_PER_DAY = 30
+
+# Emprise approximative de Paris et de la petite couronne
+LON_RANGE = (2.20, 2.50)
+LAT_RANGE = (48.78, 48.95)
+
+
+def make_station_information(scale: float = 1, seed: int = 0) -> dict:
+    """Payload au format station_information.json."""
+    rng = np.random.default_rng(seed)
+    n = int(NETWORK_STATIONS * scale)
+    lon = rng.uniform(*LON_RANGE, n)
+    lat = rng.uniform(*LAT_RANGE, n)
+    capacity = rng.integers(12, 60, n)
+
+    stations = [
+        {
+            "station_id": 100_000_000 + i,
+            "stationCode": str(10_000 + i),
+            "name": f"Station {i}",
+            "lat": float(lat[i]),
+            "lon": float(lon[i]),
+            "capacity": int(capacity[i]),
+            "station_opening_hours": None,
+            "rental_methods": ["CREDITCARD"],
+        }
+        for i in range(n)
+    ]
+    return {"lastUpdatedOther": 1_760_000_000, "ttl": 3600, "data": {"stations": stations}}
+
+
+def make_station_status(info: dict, seed: int = 0) -> dict:
+    """Payload au format station_status.json, cohérent avec `info`."""
+    rng = np.random.default_rng(seed)
+    stations = []
+    for s in info["data"]["stations"]:
+        capacity = s["capacity"]
+        bikes = int(rng.integers(0, capacity + 1))
+        ebikes = int(rng.integers(0, bikes + 1))
+        mechanical = bikes - ebikes
+        docks = capacity - bikes
+        stations.append({
+            "station_id": s["station_id"],
+            "stationCode": s["stationCode"],
+            "num_bikes_available": bikes,
+            "numBikesAvailable": bikes,
+            "num_bikes_available_types": [{"mechanical": mechanical}, {"ebike": ebikes}],
+            "num_docks_available": docks,
+            "numDocksAvailable": docks,
+            "is_installed": int(rng.random() > 0.02),
+            "is_returning": 1,
+            "is_renting": 1,
+            "last_reported": 1_760_000_000,
+            "station_opening_hours": None,
+        })
+    return {"lastUpdatedOther": 1_760_000_000, "ttl": 60, "data": {"stations": stations}}
+
+
+def station_codes(info: dict) -> np.ndarray:
+    return np.array([int(s["stationCode"]) for s in info["data"]["stations"]])
+
+
+def make_dim_station(info: dict) -> pd.DataFrame:
+    """Table dim_station."""
+    stations = info["data"]["stations"]
+    return pd.DataFrame({
+        "station_id": station_codes(info),
+        "station_name": [s["name"] for s in stations],
+        "latitude": [s["lat"] for s in stations],
+        "longitude": [s["lon"] for s in stations],
+    })
+
+
+def make_trips(info: dict, days: int = 7, seed: int = 0, now=None) -> pd.DataFrame:
+    """Table fact_velib_trips sur les `days` derniers jours.
+
+    Durées et distances suivent des lois exponentielles, avec une petite part
+    de trajets aberrants (vélos oubliés, boucles sur la même station).
+    """
+    rng = np.random.default_rng(seed)
+    codes = station_codes(info)
+    names = np.array([s["name"] for s in info["data"]["stations"]])
+    n = len(codes) * TRIPS_PER_STATION_PER_DAY * days
+    now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+
+    start_idx = rng.integers(0, len(codes), n)
+    end_idx = rng.integers(0, len(codes), n)
+    duration_min = rng.exponential(14, n)
+    outliers = rng.random(n) < 0.005
+    duration_min[outliers] = rng.uniform(300, 5000, outliers.sum())
+    distance_km = rng.exponential(2.5, n)
+    loops = rng.random(n) < 0.01
+    end_idx[loops] = start_idx[loops]
+    distance_km[loops] = 0
+
+    start_time = now - pd.to_timedelta(rng.uniform(0, days * 86400, n), unit="s")
+    end_time = start_time + pd.to_timedelta(duration_min, unit="min")
+
+    return pd.DataFrame({
+        "bike_id": rng.integers(0, len(codes) * 12, n).astype(str),
+        "is_electric": rng.random(n) < 0.4,
+        "start_station_id": codes[start_idx],
+        "start_station_name": names[start_idx],
+        "end_station_id": codes[end_idx],
+        "end_station_name": names[end_idx],
+        "start_time": start_time,
+        "end_time": end_time,
+        "duration_sec": duration_min * 60,
+        "duration_min": duration_min,
+        "distance_km": distance_km,
+        "avg_speed_kmh": distance_km / np.maximum(duration_min, 1e-3) * 60,
+    })
+
+
+def make_station_status_history(info: dict, days: int = 7, freq: str = "15min", seed: int = 0, now=None) -> pd.DataFrame:
+    """Table fact_station_status : un relevé par station tous les `freq`."""
+    rng = np.random.default_rng(seed)
+    codes = station_codes(info)
+    capacity = np.array([s["capacity"] for s in info["data"]["stations"]])
+    now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+    times = pd.date_range(now.floor(freq) - pd.Timedelta(days=days), now.floor(freq), freq=freq)
+
+    n_times = len(times)
+    hours = times.tz_convert("Europe/Paris").hour.to_numpy()
+    # Profil journalier : stations plus vides en journée, avec un décalage par station
+    phase = rng.uniform(0, 2 * np.pi, len(codes))
+    fill = 0.5 + 0.4 * np.sin(2 * np.pi * hours[None, :] / 24 + phase[:, None])
+    bikes = np.clip(np.rint(fill * capacity[:, None] + rng.normal(0, 2, (len(codes), n_times))), 0, capacity[:, None])
+    ebikes = np.rint(bikes * rng.uniform(0.2, 0.6, (len(codes), 1)))
+
+    return pd.DataFrame({
+        "station_id": np.repeat(codes, n_times),
+        "file_date": times[np.tile(np.arange(n_times), len(codes))],
+        "nb_bike": (bikes - ebikes).astype(np.int64).ravel(),
+        "nb_ebike": ebikes.astype(np.int64).ravel(),
+        "nb_bike_blocked_to_collect": rng.integers(0, 2, len(codes) * n_times),
+        "nb_bike_blocked_to_fix": rng.integers(0, 3, len(codes) * n_times),
+    })
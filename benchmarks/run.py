@@ -0,0 +1,141 @@
+"""Banc de mesure des pipelines Vélibstat.
+
+Exemples :
+
+    python -m benchmarks.run                      # réseau réel (1×)
+    python -m benchmarks.run --scale 1 10 100 --history-days 1
+    python -m benchmarks.run --page Ville --compare latest
+
+Chaque exécution est enregistrée dans benchmarks/results/<horodatage>.json ;
+`--compare` affiche l'évolution par rapport à une exécution précédente
+(`latest` ou chemin d'un fichier de résultats).
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.cases import CASES, Data, input_rows
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def measure(case, args, repeat: int) -> dict:
+    # Premier appel hors mesure : imports paresseux, caches pandas
+    case.run(*args)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case.run(*args)
+        times.append(time.perf_counter() - start)
+
+    # Mémoire mesurée à part : tracemalloc ralentit l'exécution
+    tracemalloc.start()
+    case.run(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "peak_mb": peak / 2**20,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def latest_results(exclude: Path = None) -> Path:
+    runs = sorted(p for p in RESULTS_DIR.glob("*.json") if p != exclude)
+    return runs[-1] if runs else None
+
+
+def compare(current: list, previous: list) -> pd.DataFrame:
+    key = ["case", "scale"]
+    merged = pd.DataFrame(current).merge(pd.DataFrame(previous), on=key, how="left", suffixes=("", "_prev"))
+    merged["time_ratio"] = merged["min_s"] / merged["min_s_prev"]
+    merged["memory_ratio"] = merged["peak_mb"] / merged["peak_mb_prev"]
+    return merged[key + ["min_s_prev", "min_s", "time_ratio", "peak_mb_prev", "peak_mb", "memory_ratio"]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, nargs="+", default=[1], help="taille en multiples du réseau Vélib")
+    parser.add_argument("--page", nargs="+", help="ne mesurer que ces pages")
+    parser.add_argument("--case", nargs="+", help="ne mesurer que les cas contenant ces motifs")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--trip-days", type=int, default=7, help="jours de trajets générés")
+    parser.add_argument("--history-days", type=int, default=7, help="jours de relevés fact_station_status générés")
+    parser.add_argument("--compare", help="'latest' ou chemin d'un fichier de résultats")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args(argv)
+
+    cases = [
+        c for c in CASES
+        if (not args.page or c.page in args.page)
+        and (not args.case or any(pattern in c.name for pattern in args.case))
+    ]
+
+    results = []
+    for scale in args.scale:
+        data = Data(scale, trip_days=args.trip_days, history_days=args.history_days)
+        for case in cases:
+            case_args = case.setup(data)
+            result = {"case": case.name, "page": case.page, "scale": scale, "rows": input_rows(case_args)}
+            result.update(measure(case, case_args, args.repeat))
+            results.append(result)
+            print(
+                f"{case.page:<14} {case.name:<34} ×{scale:<5g} {result['rows']:>11,} lignes "
+                f"{result['min_s'] * 1000:>10.2f} ms {result['peak_mb']:>9.1f} Mo"
+            )
+
+    run = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            "trip_days": args.trip_days,
+            "history_days": args.history_days,
+        },
+        "results": results,
+    }
+
+    output = None
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+        output.write_text(json.dumps(run, indent=2))
+        print(f"\nRésultats enregistrés dans {output}")
+
+    if args.compare:
+        previous_path = latest_results(exclude=output) if args.compare == "latest" else Path(args.compare)
+        if previous_path is None:
+            print("Aucune exécution précédente à comparer.")
+        else:
+            previous = json.loads(previous_path.read_text())["results"]
+            print(f"\nComparaison avec {previous_path}")
+            with pd.option_context("display.width", 200, "display.max_rows", None):
+                print(compare(results, previous).round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from velibstat import cached, debug, occupancy, pipelines
+
+# ----------------------------------------------------
+# Page config
+# ----------------------------------------------------
+st.set_page_config(page_title="Velib Stats - Occupation", layout="wide")
+debug.start_page()
+st.title("Velib Stats - Occupation par heure de la semaine")
+
+# ----------------------------------------------------
+# Sidebar
+# ----------------------------------------------------
+st.sidebar.title("🚲 Vélibstat")
+st.sidebar.caption("Créé par [Nicolas](https://www.linkedin.com/in/nicolas-bouttier/)")
+
+
+def heatmap(week):
+    """Carte de chaleur jours × heures d'un tableau occupancy.as_week()."""
+    df = week.rename_axis("jour").reset_index().melt(id_vars="jour", var_name="heure", value_name="remplissage")
+    return alt.Chart(df).mark_rect().encode(
+        x=alt.X("heure:O", title="Heure"),
+        y=alt.Y("jour:N", sort=occupancy.DAYS, title=None),
+        color=alt.Color("remplissage:Q", scale=alt.Scale(domain=[0, 1], scheme="redyellowgreen"), title="Vélos / capacité"),
+        tooltip=["jour", "heure", alt.Tooltip("remplissage:Q", format=".0%")],
+    )
+
+
+# ----------------------------------------------------
+# Données : tenseur sur disque + stations localisées
+# ----------------------------------------------------
+tensor = cached.occupancy_tensor()
+if not len(tensor.station_ids):
+    st.warning("Aucun historique d'occupation disponible.")
+    debug.stop()
+
+st.caption(
+    f"Moyennes par heure de la semaine (heure de Paris) sur l'historique de {len(tensor.station_ids)} stations, "
+    f"jusqu'au {tensor.last_day:%d/%m/%Y}. Remplissage = vélos disponibles / capacité actuelle."
+)
+
+live = cached.live_stations()
+df = live.stations.join(cached.station_areas(live.info_version, live.info), on="station_id")
+
+# ----------------------------------------------------
+# Réseau et commune
+# ----------------------------------------------------
+st.subheader("🌍 Tout le réseau")
+network_week = pipelines.occupancy_heatmap(tensor, df)
+st.altair_chart(heatmap(network_week), use_container_width=True)
+
+st.subheader("🏙️ Par commune")
+selected_city = st.selectbox("Sélectionnez une commune", options=sorted(df["ville"].dropna().unique()))
+city_week = pipelines.occupancy_heatmap(tensor, df[df["ville"] == selected_city])
+st.altair_chart(heatmap(city_week), use_container_width=True)
+
+# ----------------------------------------------------
+# Créneau précis
+# ----------------------------------------------------
+col1, col2 = st.columns(2)
+with col1:
+    day = st.selectbox("Jour", options=occupancy.DAYS)
+with col2:
+    hour = st.slider("Heure", min_value=0, max_value=23, value=8)
+
+col1, col2 = st.columns(2)
+for col, label, week in [(col1, "Réseau", network_week), (col2, selected_city, city_week)]:
+    value = week.loc[day, hour]
+    col.metric(f"{label}, {day.lower()} {hour}h", "–" if pd.isna(value) else f"{value:.0%}")
+
+debug.debug_panel()
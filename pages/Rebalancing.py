@@ -0,0 +1,89 @@
+import pandas as pd
+import streamlit as st
+
+from velibstat import cached, debug, hotspots, pipelines, queries
+
+# ----------------------------------------------------
+# Streamlit page config
+# ----------------------------------------------------
+st.set_page_config(page_title="Velib Stats - Rééquilibrage", layout="wide")
+debug.start_page()
+st.title("Velib Stats - Stations à rééquilibrer")
+
+# ----------------------------------------------------
+# Sidebar
+# ----------------------------------------------------
+st.sidebar.title("🚲 Vélibstat")
+st.sidebar.caption("Créé par [Nicolas](https://www.linkedin.com/in/nicolas-bouttier/)")
+
+# ----------------------------------------------------
+# Charger les données Vélib temps réel (API)
+# ----------------------------------------------------
+live = cached.live_stations()
+df = pipelines.rebalancing_stations(live)
+
+# ----------------------------------------------------
+# Période
+# ----------------------------------------------------
+horizon_map = {"7 derniers jours": 7, "14 derniers jours": 14}
+periode_label = st.pills("Historique pris en compte", options=list(horizon_map.keys()), default="7 derniers jours")
+days = horizon_map[periode_label or "7 derniers jours"]
+
+# ----------------------------------------------------
+# Historique des relevés et flux de trajets
+# ----------------------------------------------------
+@st.cache_data(ttl=6 * 60 * 60, show_spinner="Chargement historique BigQuery…")
+def load_snapshot_counts(days: int):
+    return queries.load_snapshot_counts(cached.bigquery_client(), days)
+
+@st.cache_data(ttl=6 * 60 * 60, show_spinner="Chargement des trajets…")
+def load_flows(days: int):
+    return queries.load_station_flows(cached.bigquery_client(), days)
+
+# L'état est partagé entre les sessions : chaque nouveau flux GBFS n'y est
+# intégré qu'une fois, sans relire l'historique.
+@st.cache_resource(ttl=6 * 60 * 60)
+def get_hotspot_state(days: int, _stations: pd.DataFrame, _last_updated: int):
+    capacity = _stations.set_index("station_id")["capacity"]
+    return {"state": hotspots.init_state(load_snapshot_counts(days), capacity, days, _last_updated)}
+
+last_updated = int(live.last_updated.timestamp())
+holder = get_hotspot_state(days, df, last_updated)
+holder["state"] = hotspots.update_state(holder["state"], df, last_updated)
+
+ranking = pipelines.rebalancing_ranking(holder["state"], df, load_flows(days), days)
+
+# ----------------------------------------------------
+# Affichage
+# ----------------------------------------------------
+nb_top = st.slider("Nombre de stations affichées", min_value=5, max_value=50, value=15)
+
+columns = {
+    "name": "Station",
+    "num_bikes_available": "Vélos",
+    "num_docks_available": "Bornes libres",
+    "empty_share": "Part du temps vide",
+    "full_share": "Part du temps pleine",
+    "net_flow_per_day": "Flux net / jour",
+    "score": "Score",
+}
+
+to_fill = ranking[ranking["besoin"] == "apporter des vélos"].head(nb_top)
+to_empty = ranking[ranking["besoin"] == "retirer des vélos"].head(nb_top)
+
+col1, col2 = st.columns(2)
+with col1:
+    st.subheader("🔴 Stations à remplir")
+    st.dataframe(to_fill[list(columns)].rename(columns=columns).round(2), use_container_width=True, hide_index=True)
+with col2:
+    st.subheader("🔵 Stations à vider")
+    st.dataframe(to_empty[list(columns)].rename(columns=columns).round(2), use_container_width=True, hide_index=True)
+
+st.subheader("🗺️ Carte des stations à rééquilibrer")
+map_data = pd.concat([
+    to_fill[["lat", "lon"]].assign(color="#d62728"),
+    to_empty[["lat", "lon"]].assign(color="#1f77b4"),
+])
+st.map(map_data, zoom=11, color="color", use_container_width=True)
+
+debug.debug_panel()
@@ -1,15 +1,13 @@
 import pandas as pd
 import streamlit as st
-import requests
-from datetime import timedelta
-from google.cloud import bigquery
-from google.oauth2 import service_account
-import pytz
+
+from velibstat import cached, debug, forecast, history, maps, pipelines, queries
 
 # ----------------------------------------------------
 # Streamlit page config
 # ----------------------------------------------------
 st.set_page_config(page_title="Velib Stats - Station", layout="wide")
+debug.start_page()
 st.title("Velib Stats - Station")
 
 # ----------------------------------------------------
@@ -19,47 +17,39 @@ st.sidebar.title("🚲 Vélibstat")
 st.sidebar.caption("Créé par [Nicolas](https://www.linkedin.com/in/nicolas-bouttier/)")
 
 # ----------------------------------------------------
-# Charger les données Vélib temps réel (API)
+# Charger les données Vélib temps réel (API) + infos stations
 # ----------------------------------------------------
-URL_status = "https://velib-metropole-opendata.smovengo.cloud/opendata/Velib_Metropole/station_status.json"
-data_status = requests.get(URL_status).json()
-df_status = pd.DataFrame(data_status["data"]["stations"])
-
-def extract_bike_types(x):
-    mechanical = 0
-    ebike = 0
-    if isinstance(x, list):
-        for item in x:
-            if isinstance(item, dict):
-                mechanical += item.get("mechanical", 0)
-                ebike += item.get("ebike", 0)
-    return {"mechanical_available": mechanical, "ebike_available": ebike}
-
-bike_types_df = df_status["num_bikes_available_types"].apply(extract_bike_types).apply(pd.Series)
-df_status = pd.concat([df_status.drop(columns=["num_bikes_available_types"]), bike_types_df], axis=1)
-df_status = df_status.drop(columns=["station_opening_hours", "numBikesAvailable", "numDocksAvailable"], errors="ignore")
+live = cached.live_stations()
+df = live.stations
 
 # ----------------------------------------------------
-# Infos stations
+# Sélection station(s)
 # ----------------------------------------------------
-URL_info = "https://velib-metropole-opendata.smovengo.cloud/opendata/Velib_Metropole/station_information.json"
-data_info = requests.get(URL_info).json()
-df_info = pd.DataFrame(data_info["data"]["stations"])
-df_info = df_info.drop(columns=["station_opening_hours", "rental_methods"], errors="ignore")
+mode = st.pills("Mode", options=["Une station", "Comparer des stations"], default="Une station")
+compare_mode = mode == "Comparer des stations"
 
-# Merge info + status
-df = df_status.merge(df_info, on="station_id", suffixes=("_status", "_info"))
+if not compare_mode:
+    station_names = ["Toutes les stations"] + sorted(df["name"].unique())
+    selected_station = st.selectbox("Sélectionnez une station", options=station_names)
 
-# ----------------------------------------------------
-# Sélection station
-# ----------------------------------------------------
-station_names = ["Toutes les stations"] + sorted(df["name"].unique())
-selected_station = st.selectbox("Sélectionnez une station", options=station_names)
-
-if selected_station != "Toutes les stations":
-    df_filtered = df[df["name"] == selected_station].copy()
+    if selected_station != "Toutes les stations":
+        df_filtered = df[df["name"] == selected_station].copy()
+    else:
+        df_filtered = df.copy()
 else:
-    df_filtered = df.copy()
+    selected_station = None
+    source = st.radio(
+        "Stations à comparer",
+        options=["Choisir les stations", "Toutes les stations d'une commune"],
+        horizontal=True,
+    )
+    if source == "Choisir les stations":
+        selected_names = st.multiselect("Sélectionnez les stations", options=sorted(df["name"].unique()))
+        df_filtered = df[df["name"].isin(selected_names)].copy()
+    else:
+        villes = df["station_id"].map(cached.station_areas(live.info_version, live.info)["ville"])
+        selected_city = st.selectbox("Sélectionnez une commune", options=sorted(villes.dropna().unique()))
+        df_filtered = df[villes == selected_city].copy()
 
 # ----------------------------------------------------
 # INDICATEURS TEMPS RÉEL (API)
@@ -82,15 +72,8 @@ with col3:
 # ----------------------------------------------------
 # Carte
 # ----------------------------------------------------
-st.map(df_filtered, zoom=11, use_container_width=True)
-
-# ----------------------------------------------------
-# Client BigQuery
-# ----------------------------------------------------
-credentials = service_account.Credentials.from_service_account_info(
-    st.secrets["gcp_service_account"]
-)
-client = bigquery.Client(credentials=credentials, project=credentials.project_id)
+st.map(maps.map_layer(df_filtered, 11), zoom=11, color="color", size="size", use_container_width=True)
+st.caption(maps.LEGEND, unsafe_allow_html=True)
 
 # ----------------------------------------------------
 # Filtre temporel
@@ -101,42 +84,91 @@ horizon_map = {"Jour N-1":1, "7 derniers jours":7}
 periode_label = st.pills("Choisir la période", options=list(horizon_map.keys()), default="Jour N-1")
 days = horizon_map[periode_label]
 
-utc = pytz.UTC
-today = pd.Timestamp.now(tz=utc).normalize()
-start_date = today - timedelta(days=days)
-
 # ----------------------------------------------------
-# Query par station + période
+# Query par station(s) + période
 # ----------------------------------------------------
+# Une seule requête pour toutes les stations sélectionnées : comparer dix
+# stations ne coûte qu'un aller-retour BigQuery.
 @st.cache_data(ttl=1800, show_spinner="Chargement historique BigQuery…")
-def load_station_history(station_id: int, days: int):
-    query = f"""
-    SELECT 
-        file_date, 
-        nb_bike,
-        nb_ebike,
-        nb_bike_blocked_to_collect,
-        nb_bike_blocked_to_fix
-    FROM `projet-velib-474009.velib_bronze.fact_station_status`
-    WHERE station_id = {station_id}
-      AND file_date >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {days} DAY)
-    ORDER BY file_date
-    """
-    df = client.query(query).to_dataframe()
-    df = df.sort_values("file_date").set_index("file_date")
-    return df
-
-if selected_station != "Toutes les stations":
+def load_stations_history(station_ids: tuple, days: int):
+    return queries.load_stations_history(cached.bigquery_client(), station_ids, days)
+
+# Pas de la grille temporelle commune utilisée pour aligner les stations
+grid_freq = {1: "15min", 7: "1h"}
+
+if compare_mode:
+    station_labels = pipelines.station_labels(df_filtered)
+    if station_labels:
+        df_bg = load_stations_history(tuple(sorted(station_labels)), days)
+    else:
+        df_bg = pd.DataFrame()
+elif selected_station != "Toutes les stations":
     station_id = df_filtered["stationCode_info"].iloc[0]
-    df_bg = load_station_history(station_id, days)
+    df_bg = history.station_history(load_stations_history((int(station_id),), days))
 else:
     df_bg = pd.DataFrame()  # vide si toutes les stations
 
+# ----------------------------------------------------
+# Prévision de disponibilité
+# ----------------------------------------------------
+@st.cache_resource(ttl=24 * 60 * 60, show_spinner="Entraînement du modèle de prévision…")
+def load_forecast_model(weeks: int = 4):
+    df_train = queries.load_hourly_availability(cached.bigquery_client(), 7 * weeks)
+    if df_train.empty:
+        return None
+    return forecast.train(df_train)
+
+st.header("Prévision de disponibilité")
+horizon_min = st.pills("Horizon", options=[15, 30, 60], default=30, format_func=lambda m: f"{m} min") or 30
+
+has_selection = compare_mode or selected_station != "Toutes les stations"
+if has_selection and pipelines.station_labels(df_filtered):
+    model = load_forecast_model()
+    if model is None:
+        st.warning("Historique insuffisant pour entraîner le modèle de prévision.")
+    else:
+        df_forecast = pipelines.station_forecasts(model, df_filtered, pd.Timestamp.now(tz="UTC"), horizon_min)
+        if not compare_mode:
+            row = df_forecast.iloc[0]
+            if pd.isna(row["expected_bikes"]):
+                st.warning("Pas d'historique pour cette station.")
+            else:
+                col1, col2 = st.columns(2)
+                col1.metric(f"🚲 Vélos attendus dans {horizon_min} min", f"{row['expected_bikes']:.0f}")
+                col2.metric("✅ Probabilité d'avoir un vélo", f"{row['p_bike']:.0%}")
+        else:
+            st.dataframe(
+                pd.DataFrame({
+                    "Station": df_forecast["name"],
+                    "Vélos actuels": df_forecast["num_bikes_available"],
+                    f"Vélos attendus ({horizon_min} min)": df_forecast["expected_bikes"].round(1),
+                    "Probabilité d'avoir un vélo": (100 * df_forecast["p_bike"]).round(0),
+                }),
+                use_container_width=True,
+                hide_index=True,
+            )
+else:
+    st.info("Sélectionnez une station pour afficher la prévision.")
+
 # ----------------------------------------------------
 # Graphiques
 # ----------------------------------------------------
 st.header("Évolution des vélos libres")
-if selected_station != "Toutes les stations":
+if compare_mode:
+    if not df_bg.empty:
+        comparison = pipelines.station_comparison(df_bg, station_labels, grid_freq[days])
+        tab_total, tab_meca, tab_elec = st.tabs(["Tous les vélos", "Mécaniques libres", "Électriques libres"])
+        with tab_total:
+            st.line_chart(comparison["nb_total"])
+        with tab_meca:
+            st.line_chart(comparison["nb_bike"])
+        with tab_elec:
+            st.line_chart(comparison["nb_ebike"])
+    elif df_filtered.empty:
+        st.info("Sélectionnez au moins une station pour afficher la comparaison.")
+    else:
+        st.warning("Aucune donnée disponible pour cette période ou ces stations.")
+elif selected_station != "Toutes les stations":
     if not df_bg.empty:
         st.line_chart(
             df_bg[["nb_bike","nb_ebike"]].rename(
@@ -152,7 +184,20 @@ else:
 # Graphiques vélos à réparer / à enlever avec sous-titre par graphique
 # ----------------------------------------------------
 st.header("Vélos à réparer / à enlever")
-if selected_station != "Toutes les stations":
+if compare_mode:
+    if not df_bg.empty:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("Vélos à réparer")
+            st.line_chart(comparison["nb_bike_blocked_to_fix"])
+        with col2:
+            st.subheader("Vélos à enlever")
+            st.line_chart(comparison["nb_bike_blocked_to_collect"])
+    elif df_filtered.empty:
+        st.info("Sélectionnez au moins une station pour afficher ces graphiques.")
+    else:
+        st.warning("Aucune donnée disponible pour cette période ou ces stations.")
+elif selected_station != "Toutes les stations":
     if not df_bg.empty:
         col1, col2 = st.columns(2)
         with col1:
@@ -166,4 +211,4 @@ if selected_station != "Toutes les stations":
 else:
     st.info("Sélectionnez une station pour afficher ces graphiques.")
 
-
+debug.debug_panel()
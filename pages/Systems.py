@@ -0,0 +1,85 @@
+import streamlit as st
+
+from velibstat import cached, debug, maps, pipelines, systems
+
+# ----------------------------------------------------
+# Page config
+# ----------------------------------------------------
+st.set_page_config(page_title="Velib Stats - Réseaux GBFS", layout="wide")
+debug.start_page()
+st.title("Velib Stats - Réseaux GBFS")
+st.caption(
+    "Vélib' comparé à d'autres systèmes de vélos en libre-service publiant leurs données au format "
+    "[GBFS](https://gbfs.org)."
+)
+
+# ----------------------------------------------------
+# Sidebar
+# ----------------------------------------------------
+st.sidebar.title("🚲 Vélibstat")
+st.sidebar.caption("Créé par [Nicolas](https://www.linkedin.com/in/nicolas-bouttier/)")
+
+# ----------------------------------------------------
+# Sélection des systèmes
+# ----------------------------------------------------
+fetcher = cached.system_fetcher()
+registry = fetcher.systems
+
+selected = st.multiselect(
+    "Systèmes à comparer",
+    options=list(registry),
+    default=[s for s in systems.SYSTEMS if s in registry],
+    format_func=lambda system_id: f"{registry[system_id].name} ({registry[system_id].location})",
+)
+if not selected:
+    st.info("Sélectionnez au moins un système.")
+    debug.stop()
+
+# ----------------------------------------------------
+# Flux temps réel, tous systèmes en parallèle
+# ----------------------------------------------------
+result = fetcher.fetch_all(selected)
+data = pipelines.systems(result.payloads, registry, result.errors)
+
+for system_id, message in data.errors.items():
+    st.warning(f"{registry[system_id].name} indisponible : {message}")
+
+if data.summary.empty:
+    debug.stop()
+
+# ----------------------------------------------------
+# Comparaison
+# ----------------------------------------------------
+st.subheader("📊 Indicateurs par système")
+summary = data.summary.set_index("name")
+st.dataframe(
+    summary[[
+        "location", "nb_stations", "nb_stations_available", "capacity",
+        "nb_bikes_available", "nb_ebike_available", "nb_docks_available", "last_updated",
+    ]].rename(columns={
+        "location": "Ville",
+        "nb_stations": "Stations",
+        "nb_stations_available": "Stations en service",
+        "capacity": "Emplacements",
+        "nb_bikes_available": "Vélos disponibles",
+        "nb_ebike_available": "dont électriques",
+        "nb_docks_available": "Emplacements libres",
+        "last_updated": "Mise à jour",
+    }),
+    use_container_width=True,
+)
+
+st.subheader("🚲 Vélos disponibles par emplacement")
+st.bar_chart(summary["nb_bikes_available"] / summary["capacity"].where(summary["capacity"] > 0))
+
+# ----------------------------------------------------
+# Cartes
+# ----------------------------------------------------
+st.subheader("🗺️ Cartes")
+tabs = st.tabs([registry[system_id].name for system_id in data.live])
+for tab, (system_id, live) in zip(tabs, data.live.items()):
+    with tab:
+        st.map(maps.map_layer(live.stations, 11), zoom=11, color="color", size="size", use_container_width=True)
+        st.caption(maps.LEGEND, unsafe_allow_html=True)
+
+debug.debug_panel()
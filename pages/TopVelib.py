@@ -1,23 +1,12 @@
 import streamlit as st
-import pandas as pd
-from google.cloud import bigquery
-from google.oauth2 import service_account
 
-# ----------------------------------------------------
-# BigQuery client
-# ----------------------------------------------------
-credentials = service_account.Credentials.from_service_account_info(
-    st.secrets["gcp_service_account"]
-)
-client = bigquery.Client(
-    credentials=credentials,
-    project=credentials.project_id
-)
+from velibstat import cached, debug, pipelines, quality, queries
 
 # ----------------------------------------------------
 # Page config
 # ----------------------------------------------------
 st.set_page_config(page_title="Velib – Top vélos", layout="wide")
+debug.start_page()
 st.title("Velib – Top vélos")
 
 # ----------------------------------------------------
@@ -25,6 +14,7 @@ st.title("Velib – Top vélos")
 # ----------------------------------------------------
 st.sidebar.title("🚲 Vélibstat")
 st.sidebar.caption("Créé par [Nicolas](https://www.linkedin.com/in/nicolas-bouttier/)")
+clean = st.sidebar.toggle("Exclure les trajets aberrants", value=True)
 
 # ----------------------------------------------------
 # Horizon de période et pills
@@ -43,62 +33,24 @@ days = horizon_map[periode_label]
 # ----------------------------------------------------
 @st.cache_data(ttl=12*60*60)
 def load_trips(days):
-    query = f"""
-    SELECT
-        bike_id,
-        start_station_id,
-        end_station_id,
-        start_time,
-        end_time,
-        duration_min,
-        distance_km
-    FROM `projet-velib-474009.velib_bronze.fact_velib_trips`
-    WHERE start_time >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {days} DAY)
-    """
-    return client.query(query).to_dataframe()
+    columns = ["bike_id", "start_station_id", "end_station_id", "start_time", "end_time", "duration_min", "distance_km"]
+    return queries.load_trips(cached.bigquery_client(), days, columns)
 
+# Masque qualité calculé une fois par chargement des trajets
 @st.cache_data(ttl=12*60*60)
-def load_dim_station():
-    query = """
-    SELECT station_id, station_name, latitude, longitude
-    FROM `projet-velib-474009.velib_bronze.dim_station`
-    """
-    return client.query(query).to_dataframe()
-
-df_trips = load_trips(days)
-df_dim_station = load_dim_station()
-
-# ----------------------------------------------------
-# Ajouter noms et coordonnées des stations
-# ----------------------------------------------------
-df_trips = df_trips.merge(
-    df_dim_station.rename(columns={
-        "station_id": "start_station_id",
-        "station_name": "start_station_name",
-        "latitude": "start_lat",
-        "longitude": "start_lon"
-    }), on="start_station_id", how="left"
-)
-
-df_trips = df_trips.merge(
-    df_dim_station.rename(columns={
-        "station_id": "end_station_id",
-        "station_name": "end_station_name",
-        "latitude": "end_lat",
-        "longitude": "end_lon"
-    }), on="end_station_id", how="left"
-)
+def load_quality_flags(days):
+    return quality.flag_trips(load_trips(days))
 
-# ----------------------------------------------------
-# Top vélo par nombre de trajets
-# ----------------------------------------------------
-trips_per_bike = df_trips.groupby("bike_id").size().reset_index(name="nb_trips")
-top_bike_trips = trips_per_bike.sort_values("nb_trips", ascending=False).iloc[0]
+@st.cache_data(ttl=12*60*60)
+def load_dim_station():
+    return queries.load_dim_station(cached.bigquery_client())
 
 # ----------------------------------------------------
-# Trajet le plus long en km
+# Top vélo par nombre de trajets, trajet le plus long en km
 # ----------------------------------------------------
-df_longest_trip = df_trips.sort_values("distance_km", ascending=False).iloc[0]
+top = pipelines.top_velib(load_trips(days), load_dim_station(), load_quality_flags(days) if clean else None)
+top_bike_trips = top.top_bike
+df_longest_trip = top.longest_trip
 
 # ----------------------------------------------------
 # Fonction pour afficher une section avec fond foncé
@@ -139,9 +91,6 @@ display_dark_section("Trajet le plus long (en km)", content_longest_trip)
 # ----------------------------------------------------
 # Map du trajet le plus long
 # ----------------------------------------------------
-map_data = pd.DataFrame([
-    {"lat": df_longest_trip['start_lat'], "lon": df_longest_trip['start_lon'], "station": "Départ"},
-    {"lat": df_longest_trip['end_lat'], "lon": df_longest_trip['end_lon'], "station": "Arrivée"}
-])
-st.map(map_data)
+st.map(top.longest_trip_map)
 
+debug.debug_panel()
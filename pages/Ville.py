@@ -1,9 +1,6 @@
-import json
-import pandas as pd
 import streamlit as st
-from shapely.geometry import shape, Point
-import requests
-from datetime import datetime
+
+from velibstat import cached, debug, maps, pipelines
 
 # ----------------------------------------------------
 # Streamlit page config
@@ -11,6 +8,7 @@ from datetime import datetime
 st.set_page_config(page_title="Velib Stats - Departements & Villes")
 st.title("Velib Stats - Departements & Villes")
 st.set_page_config(page_title="Velib",layout="wide")
+debug.start_page()
 
 # ----------------------------------------------------
 # Sidebar
@@ -21,140 +19,29 @@ st.sidebar.caption("Créé par [Nicolas](https://www.linkedin.com/in/nicolas-bou
 # ----------------------------------------------------
 # Charger la géolocalisation des communes
 # ----------------------------------------------------
-with open("./geo-limit/communes.json") as f:
-    communes_data = json.load(f)
-
-# Créer un dictionnaire avec les polygones par département
-departements_polys = {}
-for entry in communes_data:
-    # Si l'entrée est une liste, on itère sur ses éléments
-    communes_list = entry if isinstance(entry, list) else [entry]
-
-    for commune in communes_list:
-        if not isinstance(commune, dict):
-            st.warning(f"Entrée invalide : {commune}")
-            continue
-
-        departement = commune.get("departement")
-        if not departement:
-            st.warning(f"Pas de département pour la commune {commune.get('nom', 'Inconnu')}")
-            continue
-
-        dep_code = departement.get("code")
-        dep_name = departement.get("nom", "Inconnu")
-
-        try:
-            poly = shape(commune["contour"])
-            departements_polys.setdefault(dep_code, []).append(poly)
-        except Exception as e:
-            st.warning(f"Erreur création polygone pour {commune['nom']}: {e}")
-
-# Créer un dictionnaire avec les polygones par ville
-villes_polys = {}
-for entry in communes_data:
-    communes_list = entry if isinstance(entry, list) else [entry]
-
-    for commune in communes_list:
-        if not isinstance(commune, dict):
-            continue
-
-        nom_commune = commune.get("nom")
-        if not nom_commune:
-            continue
-
-        try:
-            poly = shape(commune["contour"])
-            villes_polys.setdefault(nom_commune, []).append(poly)
-        except Exception as e:
-            st.warning(f"Erreur création polygone pour {nom_commune}: {e}")
+communes, communes_errors = cached.communes()
+for message in communes_errors:
+    st.warning(message)
 
 # ----------------------------------------------------
-# Charger les données Vélib
+# Charger les données Vélib, département et ville de chaque station
 # ----------------------------------------------------
-# Status
-URL_status = "https://velib-metropole-opendata.smovengo.cloud/opendata/Velib_Metropole/station_status.json"
-data_status = requests.get(URL_status).json()
-df_status = pd.DataFrame(data_status["data"]["stations"])
-
-# Extraction ebike / mechanical
-def extract_bike_types(x):
-    if isinstance(x, list) and len(x) > 0 and isinstance(x[0], dict):
-        return {
-            "mechanical_available": x[0].get("mechanical", 0),
-            "ebike_available": x[1].get("ebike", 0) if len(x) > 1 else 0
-        }
-    return {"mechanical_available": 0, "ebike_available": 0}
-
-bike_types_df = df_status["num_bikes_available_types"].apply(extract_bike_types).apply(pd.Series)
-df_status = pd.concat([df_status.drop(columns=["num_bikes_available_types"]), bike_types_df], axis=1)
-
-# Supprimer colonnes inutiles
-df_status = df_status.drop(columns=["station_opening_hours","numBikesAvailable","numDocksAvailable"], errors='ignore')
+live = cached.live_stations()
+ville = pipelines.ville(live, communes)
+df = ville.stations
 
-# Information stations
-URL_info = "https://velib-metropole-opendata.smovengo.cloud/opendata/Velib_Metropole/station_information.json"
-data_info = requests.get(URL_info).json()
-df_info = pd.DataFrame(data_info["data"]["stations"])
-df_info = df_info.drop(columns=["station_opening_hours","rental_methods"], errors='ignore')
-
-# Merge info + status
-df = df_status.merge(df_info, on="station_id", suffixes=("_status","_info"))
-
-
-# ----------------------------------------------------
-# Fonction pour trouver le département d'une station
-# ----------------------------------------------------
-def find_location(lon, lat):
-    point = Point(lon, lat)
-    
-    # Chercher le département
-    dep_code = None
-    for code, polys in departements_polys.items():
-        if any(p.contains(point) for p in polys):
-            dep_code = code
-            break
-    
-    # Chercher la ville
-    ville_name = None
-    for ville, polys in villes_polys.items():
-        if any(p.contains(point) for p in polys):
-            ville_name = ville
-            break
-    
-    return dep_code, ville_name
-
-# Appliquer sur ton DataFrame
-df[["departement_code", "ville"]] = df.apply(
-    lambda r: find_location(r["lon"], r["lat"]),
-    axis=1,
-    result_type="expand"
-)
-
-# Filtrer uniquement les stations non localisées
-stations_non_localisees = df[df["departement_code"].isna() | df["ville"].isna()]
+# Stations non localisées
+stations_non_localisees = ville.unlocated
 
 if not stations_non_localisees.empty:
     st.warning(f"{len(stations_non_localisees)} stations n'ont pas pu être associées à un département ou une ville")
     st.dataframe(stations_non_localisees, use_container_width=True)
 
 
-# ----------------------------------------------------
-# Calcul des métriques par département
-# ----------------------------------------------------
-
-metrics = df.groupby("departement_code").agg(
-    total_stations=("station_id", "count"),
-    working_stations=("is_installed", lambda x: (x==1).sum()),
-    total_bikes=("num_bikes_available", "sum"),
-    mechanical_bikes=("mechanical_available", "sum"),
-    ebikes=("ebike_available", "sum"),
-    total_docks=("capacity", "sum")
-).reset_index()
-
 # ----------------------------------------------------
 # Affichage Streamlit
 # ----------------------------------------------------
-st.markdown(f"**Dernière mise à jour API Vélib:** {datetime.fromtimestamp(data_status.get('lastUpdatedOther', 0))}")
+st.markdown(f"**Dernière mise à jour API Vélib:** {ville.last_updated}")
 
 # Départements
 dep_labels = ["75 - Paris", "92 - Hauts-de-Seine", "93 - Seine-Saint-Denis", "94 - Val-de-Marne", "95 - Val-d'Oise"]
@@ -165,26 +52,25 @@ tabs = st.tabs(dep_labels)
 
 for tab, dep_code, dep_label in zip(tabs, dep_values, dep_labels):
     with tab:
-        villes_unique = df[df["departement_code"]==dep_code]["ville"].unique()
-        #On ordonne les noms de villes
-        villes_unique = sorted(
-            villes_unique, 
-            key=lambda x: int(''.join(filter(str.isdigit, x))) if any(c.isdigit() for c in x) else 0
-            )
-        villes_options = ["Toutes les villes"] + list(villes_unique)
+        villes_options = ["Toutes les villes"] + pipelines.cities(df, dep_code)
         
         selected_city = st.selectbox(
             f"Filtrez une ville (optionnel)",
-            options=villes_options
+            options=villes_options,
+            key=f"ville_{dep_code}",
         )
 
         # Filtrer les stations selon le département et éventuellement la ville
-        stations_filtrees = df[df["departement_code"]==dep_code]
-        if selected_city != "Toutes les villes":
-            stations_filtrees = stations_filtrees[stations_filtrees["ville"]==selected_city]
+        stations_filtrees = pipelines.filter_area(
+            df, dep_code, None if selected_city == "Toutes les villes" else selected_city
+        )
 
         # Affichage de la carte
-        st.map(stations_filtrees, zoom=11, use_container_width=True)
+        st.map(
+            maps.map_layer(stations_filtrees, 11),
+            zoom=11, color="color", size="size", use_container_width=True,
+        )
+        st.caption(maps.LEGEND, unsafe_allow_html=True)
 
         # Calculer les métriques sur le sous-ensemble
         if not stations_filtrees.empty:
@@ -201,3 +87,4 @@ for tab, dep_code, dep_label in zip(tabs, dep_values, dep_labels):
         else:
             st.warning(f"Aucune donnée pour {selected_city if selected_city != 'Toutes les villes' else dep_label}")
 
+debug.debug_panel()
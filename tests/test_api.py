@@ -0,0 +1,135 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from velibstat import api, pipelines
+
+
+def payloads():
+    status = {"last_updated": 1760000000, "data": {"stations": [
+        {"station_id": i, "stationCode": str(10000 + i), "num_bikes_available": 5, "num_docks_available": 5,
+         "num_bikes_available_types": [{"mechanical": 3}, {"ebike": 2}], "is_installed": 1, "is_renting": 1, "is_returning": 1}
+        for i in range(3)
+    ]}}
+    info = {"last_updated": 1760000000, "data": {"stations": [
+        {"station_id": i, "stationCode": str(10000 + i), "name": f"Station {i}", "lat": 48.85, "lon": 2.35, "capacity": 10}
+        for i in range(3)
+    ]}}
+    return status, info
+
+
+class FakeSources(api.Sources):
+    """Flux GBFS figés ; tout appel à BigQuery est compté."""
+
+    def __init__(self):
+        super().__init__()
+        self.queries = []
+
+    def live(self):
+        return pipelines.live_stations(*payloads())
+
+    def client(self):
+        self.queries.append("client")
+        raise api.Unavailable("pas de BigQuery dans les tests")
+
+
+@pytest.fixture(scope="module")
+def server():
+    sources = FakeSources()
+    srv = api.make_server("127.0.0.1", 0, sources)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}", sources
+    srv.shutdown()
+    srv.server_close()
+
+
+def get(url, etag=None):
+    request = urllib.request.Request(url, headers={"If-None-Match": etag} if etag else {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.headers, exc.read()
+
+
+def test_network_route_with_etag(server):
+    base, _ = server
+    status, headers, body = get(base + "/api/network")
+    assert status == 200
+    assert json.loads(body)["nb_stations"] == 3
+    assert headers["Cache-Control"].startswith("max-age=")
+
+    status, headers_304, body = get(base + "/api/network", etag=headers["ETag"])
+    assert status == 304
+    assert headers_304["ETag"] == headers["ETag"]
+    assert body == b""
+
+    assert get(base + "/api/network", etag='"autre"')[0] == 200
+
+
+@pytest.mark.parametrize("path, status, message", [
+    ("/api/nope", 404, "route inconnue"),
+    ("/api/network?x=1", 400, "paramètres inconnus : x"),
+    ("/api/network?format=xml", 400, "format inconnu"),
+    ("/api/network?format=parquet", 400, "format parquet"),
+    ("/api/bikes/top?n=0", 400, "n doit être un entier"),
+    ("/api/stations/top?days=abc", 400, "days doit être un entier"),
+    ("/api/stations/10001/history?days=8", 400, "days doit être un entier"),
+])
+def test_invalid_requests(server, path, status, message):
+    base, _ = server
+    code, _, body = get(base + path)
+    assert code == status
+    assert message in json.loads(body)["error"]
+
+
+def test_history_of_unknown_station_skips_bigquery(server):
+    base, sources = server
+    sources.queries.clear()
+    code, _, body = get(base + "/api/stations/99999/history")
+    assert code == 404
+    assert sources.queries == []
+
+    # Station connue : la requête part (et échoue ici, faute d'identifiants)
+    assert get(base + "/api/stations/10001/history")[0] == 503
+    assert sources.queries == ["client"]
+
+
+def test_ttl_cache_computes_once_and_expires():
+    cache = api.TTLCache()
+    calls = []
+    assert cache.get("k", 60, lambda: calls.append(1) or "a") == "a"
+    assert cache.get("k", 60, lambda: calls.append(1) or "b") == "a"
+    assert len(calls) == 1
+    assert 0 < cache.expires_in("k") <= 60
+
+    assert cache.get("old", -1, lambda: 1) == 1
+    assert cache.get("old", 60, lambda: 2) == 2
+
+
+def test_ttl_cache_evicts_expired_then_least_recently_used():
+    cache = api.TTLCache(max_entries=3)
+    cache.get("expired", -1, lambda: 0)
+    for key in "abc":
+        cache.get(key, 60, lambda: key)
+    assert "expired" not in cache._items
+
+    cache.get("a", 60, lambda: None)  # lecture : "a" redevient récent
+    cache.get("d", 60, lambda: "d")
+    assert list(cache._items) == ["c", "a", "d"]
+    assert len(cache) == 3
+    assert cache._locks == {}
+
+
+def test_ttl_cache_does_not_keep_failures():
+    def fail():
+        raise ValueError("échec")
+
+    cache = api.TTLCache()
+    with pytest.raises(ValueError):
+        cache.get("k", 60, fail)
+    assert len(cache) == 0
+    assert cache.get("k", 60, lambda: 1) == 1
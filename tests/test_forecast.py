@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from velibstat import forecast
+
+# Lundi 0h, heure de Paris
+MONDAY = pd.Timestamp("2025-10-06 00:00", tz=forecast.TIMEZONE)
+
+
+def hourly(station_id, values, start=MONDAY):
+    return pd.DataFrame({
+        "station_id": station_id,
+        "file_date": pd.date_range(start, periods=len(values), freq="h").tz_convert("UTC"),
+        "nb_available": np.asarray(values, dtype=float),
+    })
+
+
+def test_constant_history_predicts_constant():
+    model = forecast.train(hourly(1, [5.0] * forecast.HOURS_PER_WEEK * 2))
+    assert model.baseline.shape == (1, forecast.HOURS_PER_WEEK)
+    np.testing.assert_allclose(model.baseline, 5.0)
+    np.testing.assert_allclose(model.p_bike, 1.0)
+
+    df = forecast.predict(model, [1], [5], MONDAY + pd.Timedelta(hours=8))
+    assert df["expected_bikes"].iloc[0] == pytest.approx(5.0)
+    assert df["p_bike"].iloc[0] == pytest.approx(1.0)
+
+
+def test_sparse_slots_are_shrunk_towards_station_mean():
+    # Deux semaines à 0 vélo, sauf le lundi 8h à 10 vélos
+    values = np.zeros(forecast.HOURS_PER_WEEK * 2)
+    values[[8, forecast.HOURS_PER_WEEK + 8]] = 10
+    model = forecast.train(hourly(1, values), prior_weight=2.0)
+
+    station_mean = values.mean()
+    assert model.baseline[0, 8] == pytest.approx((20 + 2 * station_mean) / 4)
+    assert model.baseline[0, 9] == pytest.approx(2 * station_mean / 4)
+    # Sans has_bike : déduit de nb_available > 0
+    assert model.p_bike[0, 8] == pytest.approx((2 + 2 * 2 / len(values)) / 4)
+
+
+def test_recent_deviation_fades_with_horizon():
+    model = forecast.train(hourly(1, [5.0] * forecast.HOURS_PER_WEEK * 2))
+    now = MONDAY + pd.Timedelta(hours=8)
+
+    near = forecast.predict(model, [1], [15], now, horizon_min=0)
+    far = forecast.predict(model, [1], [15], now, horizon_min=60 * 24 * 7)
+    assert near["expected_bikes"].iloc[0] == pytest.approx(15.0)
+    assert far["expected_bikes"].iloc[0] == pytest.approx(5.0, abs=0.01)
+
+
+def test_unknown_stations_get_nan():
+    model = forecast.train(pd.concat([hourly(1, [3.0] * 48), hourly(3, [0.0] * 48)]))
+    df = forecast.predict(model, [0, 1, 2, 3, 4], [1, 3, 1, 0, 1], MONDAY)
+
+    assert df["station_id"].tolist() == [0, 1, 2, 3, 4]
+    assert df["expected_bikes"].isna().tolist() == [True, False, True, False, True]
+    assert df["p_bike"].iloc[3] == pytest.approx(0.0)
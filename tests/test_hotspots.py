@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from velibstat import hotspots
+
+DAY_S = 24 * 60 * 60
+
+
+def live(bikes, docks, station_ids=None):
+    station_ids = list(range(1, len(bikes) + 1)) if station_ids is None else station_ids
+    return pd.DataFrame({
+        "station_id": station_ids,
+        "name": [f"Station {i}" for i in station_ids],
+        "capacity": np.add(bikes, docks),
+        "num_bikes_available": bikes,
+        "num_docks_available": docks,
+    })
+
+
+def snapshot_counts(rows):
+    return pd.DataFrame(rows, columns=["station_id", "nb_available", "nb_snapshots"])
+
+
+def no_flows():
+    return pd.DataFrame(columns=["station_id", "nb_in", "nb_out"])
+
+
+def test_init_state_shares_from_history():
+    capacity = pd.Series([10, 10, 0], index=[1, 2, 3])
+    counts = snapshot_counts([(1, 0, 3), (1, 5, 1), (2, 10, 2), (2, 4, 2), (3, 0, 5)])
+    state = hotspots.init_state(counts, capacity, 7, 1000)
+
+    # Station 3 sans capacité : écartée
+    assert state.station_ids.tolist() == [1, 2]
+    np.testing.assert_allclose(state.empty_share, [0.75, 0.0])
+    np.testing.assert_allclose(state.full_share, [0.0, 0.5])
+    assert state.last_updated == 1000
+    assert state.window_s == 7 * DAY_S
+
+
+def test_update_state_is_weighted_by_elapsed_time():
+    state = hotspots.init_state(snapshot_counts([(1, 5, 10)]), pd.Series([10], index=[1]), 7, 0)
+    empty = live([0], [10])
+
+    # Même flux : ignoré
+    assert hotspots.update_state(state, empty, 0) is state
+
+    # Soixante flux d'une minute pèsent autant qu'un flux une heure plus tard
+    by_minute = state
+    for t in range(60, 3601, 60):
+        by_minute = hotspots.update_state(by_minute, empty, t)
+    hourly = hotspots.update_state(state, empty, 3600)
+    assert by_minute.empty_share[0] == pytest.approx(hourly.empty_share[0])
+    assert hourly.empty_share[0] == pytest.approx(1 - np.exp(-3600 / (7 * DAY_S)))
+
+    # Une semaine de relevés vides : l'historique ne pèse plus que e^-1
+    week = hotspots.update_state(state, empty, 7 * DAY_S)
+    assert week.empty_share[0] == pytest.approx(1 - np.exp(-1))
+
+
+def test_update_state_adds_new_stations_with_current_reading():
+    state = hotspots.init_state(snapshot_counts([(1, 5, 10)]), pd.Series([10], index=[1]), 7, 0)
+    state = hotspots.update_state(state, live([5, 10], [5, 0], station_ids=[1, 2]), 60)
+    assert state.station_ids.tolist() == [1, 2]
+    assert state.full_share[1] == 1.0
+    assert state.empty_share[1] == 0.0
+
+
+def test_rank_hotspots_orders_by_score_and_need():
+    state = hotspots.init_state(
+        snapshot_counts([(1, 0, 9), (1, 5, 1), (2, 10, 1), (2, 5, 9), (3, 5, 10)]),
+        pd.Series([10, 10, 10], index=[1, 2, 3]), 7, 0,
+    )
+    flows = pd.DataFrame({"station_id": [2], "nb_in": [70], "nb_out": [0]})
+    ranking = hotspots.rank_hotspots(state, live([5, 5, 5], [5, 5, 5]), flows, 7)
+
+    assert ranking["station_id"].tolist() == [2, 1, 3]
+    assert ranking["besoin"].tolist()[:2] == ["retirer des vélos", "apporter des vélos"]
+    # Flux net : 70 arrivées en 7 jours, une capacité par jour
+    assert ranking.loc[0, "score"] == pytest.approx(0.1 + 1.0)
+    assert ranking.loc[1, "score"] == pytest.approx(0.9)
+
+
+def test_rank_hotspots_without_history():
+    state = hotspots.init_state(snapshot_counts([]), pd.Series(dtype=float), 7, 0)
+    ranking = hotspots.rank_hotspots(state, live([0, 5], [10, 5]), no_flows(), 7)
+
+    assert ranking["station_id"].tolist() == [1, 2]
+    assert ranking["empty_share"].tolist() == [0.0, 0.0]
+    assert ranking.loc[0, "score"] == 1.0
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from velibstat import maps
+
+
+def stations():
+    return pd.DataFrame({
+        "station_id": [1, 2, 3, 4],
+        "name": ["a", "b", "c", "d"],
+        "lat": [48.8566123, 48.86, 48.87, 48.88],
+        "lon": [2.3522219, 2.36, 2.37, 2.38],
+        "num_bikes_available": [0, 10, 1, 5],
+        "num_docks_available": [10, 0, 9, 5],
+        "capacity": [10, 10, 10, 10],
+    })
+
+
+def test_map_layer_sends_one_compact_point_per_station():
+    layer = maps.map_layer(stations(), 10)
+    assert list(layer.columns) == ["lat", "lon", "color", "size"]
+    assert len(layer) == 4
+    assert layer.loc[0, "lat"] == 48.85661
+    assert layer.loc[0, "lon"] == 2.35222
+
+
+def test_map_layer_colours_availability():
+    layer = maps.map_layer(stations(), 10)
+    assert layer["color"].tolist() == [maps.COLOR_EMPTY, maps.COLOR_FULL, maps.COLOR_LOW, maps.COLOR_OK]
+
+
+def test_map_layer_size_is_a_constant_pixel_radius():
+    at_10 = maps.map_layer(stations(), 10)["size"]
+    at_11 = maps.map_layer(stations(), 11)["size"]
+    assert at_10[0] == pytest.approx(maps.STATION_PX * maps.meters_per_pixel(48.8566123, 10), abs=0.5)
+    assert (at_11 - at_10 / 2).abs().max() <= 1
+
+
+def test_availability_color_without_capacity():
+    assert maps.availability_color([0, 3], [0, 0], [0, 0]).tolist() == [maps.COLOR_EMPTY, maps.COLOR_FULL]
@@ -0,0 +1,105 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from velibstat import occupancy
+
+
+def day_rows(station_id, day: date, nb_available=1.0, hours=None):
+    """Relevés horaires d'une station sur un jour de Paris (toutes ses heures par défaut)."""
+    start = pd.Timestamp(day).tz_localize(occupancy.ZONE)
+    n = occupancy.hours_in_day(day) if hours is None else hours
+    return pd.DataFrame({
+        "station_id": station_id,
+        "file_date": pd.date_range(start, periods=n, freq="h").tz_convert("UTC"),
+        "nb_available": nb_available,
+    })
+
+
+def test_hours_in_day_follows_daylight_saving():
+    assert occupancy.hours_in_day(date(2025, 3, 30)) == 23
+    assert occupancy.hours_in_day(date(2025, 10, 26)) == 25
+    assert occupancy.hours_in_day(date(2025, 10, 27)) == 24
+
+
+def test_update_integrates_complete_days():
+    monday = date(2025, 10, 6)
+    hourly = pd.concat([day_rows(2, monday, 4.0), day_rows(1, monday, 1.0)])
+    tensor = occupancy.update(occupancy.empty(), hourly, monday)
+
+    assert tensor.last_day == monday
+    assert tensor.station_ids.tolist() == [1, 2]
+    assert tensor.counts[:, :24].tolist() == [[1] * 24, [1] * 24]
+    assert not tensor.counts[:, 24:].any()
+    np.testing.assert_allclose(tensor.sums[:, occupancy.slot(0, 8)], [1.0, 4.0])
+
+
+def test_update_stops_before_incomplete_day():
+    monday, tuesday = date(2025, 10, 6), date(2025, 10, 7)
+    hourly = pd.concat([day_rows(1, monday), day_rows(1, tuesday, hours=10)])
+    tensor = occupancy.update(occupancy.empty(), hourly, tuesday)
+
+    # Mardi, partiel, n'est pas intégré : il sera relu à la mise à jour suivante
+    assert tensor.last_day == monday
+    assert tensor.counts[0, 24:].sum() == 0
+    assert occupancy.days_to_update(tensor, date(2025, 10, 8)) == (tuesday, tuesday)
+
+
+def test_update_without_complete_day_keeps_tensor():
+    monday = date(2025, 10, 6)
+    tensor = occupancy.update(occupancy.empty(), day_rows(1, monday), monday)
+    assert occupancy.update(tensor, pd.DataFrame(columns=["station_id", "file_date", "nb_available"]), date(2025, 10, 7)) is tensor
+    assert occupancy.update(tensor, day_rows(1, date(2025, 10, 7), hours=5), date(2025, 10, 7)) is tensor
+
+
+def test_update_ignores_rows_after_end():
+    monday, tuesday = date(2025, 10, 6), date(2025, 10, 7)
+    hourly = pd.concat([day_rows(1, monday), day_rows(1, tuesday)])
+    tensor = occupancy.update(occupancy.empty(), hourly, monday)
+    assert tensor.last_day == monday
+    assert tensor.counts[0, 24:].sum() == 0
+
+
+def test_update_adds_new_stations_and_keeps_history():
+    monday, tuesday = date(2025, 10, 6), date(2025, 10, 7)
+    first = occupancy.update(occupancy.empty(), day_rows(2, monday, 3.0), monday)
+    second = occupancy.update(first, pd.concat([day_rows(2, tuesday, 5.0), day_rows(1, tuesday, 1.0)]), tuesday)
+
+    assert second.last_day == tuesday
+    assert second.station_ids.tolist() == [1, 2]
+    assert second.sums[1, occupancy.slot(0, 8)] == pytest.approx(3.0)
+    assert second.sums[1, occupancy.slot(1, 8)] == pytest.approx(5.0)
+    assert second.counts[0, :24].sum() == 0
+
+
+def test_fill_ratio_counts_only_observed_stations():
+    monday = date(2025, 10, 6)
+    hourly = pd.concat([
+        day_rows(1, monday, 5.0),
+        day_rows(1, monday, 7.0),          # deux relevés par heure : moyenne 6
+        day_rows(2, monday, 10.0),
+        day_rows(2, date(2025, 10, 7), 8.0),
+    ])
+    tensor = occupancy.update(occupancy.empty(), hourly, date(2025, 10, 7))
+
+    # Station 3 inconnue du tenseur : ignorée
+    ratio = occupancy.fill_ratio(tensor, [1, 2, 3], [10, 20, 30])
+    assert ratio.shape == (occupancy.HOURS_PER_WEEK,)
+    assert ratio[occupancy.slot(0, 8)] == pytest.approx((6 + 10) / 30)
+    assert ratio[occupancy.slot(1, 8)] == pytest.approx(8 / 20)
+    assert np.isnan(ratio[occupancy.slot(2, 8)])
+
+
+def test_save_and_load_round_trip(tmp_path):
+    monday = date(2025, 10, 6)
+    tensor = occupancy.update(occupancy.empty(), day_rows(1, monday, 2.0), monday)
+    occupancy.save(tensor, tmp_path)
+    loaded = occupancy.load(tmp_path)
+
+    assert loaded.last_day == monday
+    np.testing.assert_array_equal(loaded.station_ids, tensor.station_ids)
+    np.testing.assert_array_equal(loaded.sums, tensor.sums)
+    np.testing.assert_array_equal(loaded.counts, tensor.counts)
+    assert occupancy.load(tmp_path / "absent").last_day is None
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from velibstat import quality
+
+
+def trips(**columns):
+    return pd.DataFrame(columns, index=pd.RangeIndex(10, 10 + len(next(iter(columns.values())))))
+
+
+def test_loop_requires_same_station_and_no_distance():
+    df = trips(
+        start_station_id=[1, 1, 1],
+        end_station_id=[1, 1, 2],
+        distance_km=[0.0, 1.2, 0.0],
+        duration_min=[10.0, 10.0, 10.0],
+    )
+    assert quality.flag_trips(df)["loop"].tolist() == [True, False, False]
+
+
+def test_duplicate_flags_only_repeated_trips():
+    start = pd.Timestamp("2025-10-01 08:00", tz="UTC")
+    df = trips(
+        bike_id=[7, 7, 7, 8],
+        start_time=[start, start, start + pd.Timedelta(minutes=5), start],
+    )
+    assert quality.flag_trips(df)["duplicate"].tolist() == [False, True, False, False]
+
+
+def test_zero_duration_is_a_duration_issue_not_a_speed_issue():
+    df = trips(duration_min=[0.0, 30.0], distance_km=[5.0, 30.0])
+    flags = quality.flag_trips(df)
+    assert flags["duration"].tolist() == [True, False]
+    # 30 km en 30 min = 60 km/h
+    assert flags["speed"].tolist() == [False, True]
+
+
+def test_missing_values_are_not_flagged():
+    df = trips(
+        duration_min=[np.nan, 10.0],
+        distance_km=[2.0, np.nan],
+        start_station_id=[1, 1],
+        end_station_id=[1, 1],
+    )
+    flags = quality.flag_trips(df)
+    assert not flags[["duration", "speed", "distance", "loop"]].to_numpy().any()
+
+
+def test_rules_without_columns_are_skipped():
+    df = trips(duration_min=[0.5, 10.0])
+    flags = quality.flag_trips(df)
+    assert list(flags.columns) == quality.RULES
+    assert flags.index.equals(df.index)
+    assert flags["duration"].tolist() == [True, False]
+    assert not flags.drop(columns="duration").to_numpy().any()
+
+
+def test_valid_mask_and_summary():
+    df = trips(duration_min=[0.5, 10.0, 500.0], distance_km=[0.1, 2.0, 80.0])
+    flags = quality.flag_trips(df)
+    assert quality.valid_mask(flags).tolist() == [False, True, False]
+    counts = quality.summary(flags)
+    assert counts[quality.LABELS["duration"]] == 2
+    assert counts[quality.LABELS["distance"]] == 1
+    assert counts[quality.LABELS["loop"]] == 0
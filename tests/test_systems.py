@@ -0,0 +1,142 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from velibstat import systems
+
+GBFS_URL = "https://example.org/gbfs.json"
+STATUS_URL = "https://example.org/station_status.json"
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+        self.content = b"{}"
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """Réponses par URL ; une exception dans la table est levée à l'appel."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def get(self, url, timeout=None):
+        self.calls.append(url)
+        response = self.responses[url]
+        if isinstance(response, Exception):
+            raise response
+        return FakeResponse(response)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(systems, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def make_fetcher(responses):
+    fetcher = systems.SystemFetcher({"demo": systems.System("demo", "Demo", "Nulle part", GBFS_URL)})
+    fetcher._session = FakeSession(responses)
+    return fetcher
+
+
+def gbfs_v2(language="en"):
+    return {"ttl": 3600, "data": {language: {"feeds": [{"name": "station_status", "url": STATUS_URL}]}}}
+
+
+def status(ttl=30, bikes=1):
+    return {"ttl": ttl, "last_updated": 1, "data": {"stations": [{"station_id": "1", "num_bikes_available": bikes}]}}
+
+
+def test_discover_feeds_v2_prefers_language_then_first():
+    payload = {"data": {
+        "en": {"feeds": [{"name": "station_status", "url": "en.json"}]},
+        "fr": {"feeds": [{"name": "station_status", "url": "fr.json"}]},
+    }}
+    assert systems.discover_feeds(payload) == {"station_status": "fr.json"}
+    assert systems.discover_feeds(payload, language="de") == {"station_status": "en.json"}
+
+
+def test_discover_feeds_v3_and_empty():
+    payload = {"version": "3.0", "data": {"feeds": [
+        {"name": "station_status", "url": "s.json"}, {"name": "station_information", "url": "i.json"},
+    ]}}
+    assert systems.discover_feeds(payload) == {"station_status": "s.json", "station_information": "i.json"}
+    assert systems.discover_feeds({"data": {}}) == {}
+
+
+def test_max_age_is_bounded():
+    assert systems.max_age({"ttl": 0}, "station_status") == systems.MIN_AGE
+    assert systems.max_age({"ttl": 3600}, "station_status") == systems.MAX_AGE["station_status"]
+    assert systems.max_age({"ttl": 30}, "station_status") == 30
+
+
+def test_feed_is_cached_until_its_ttl(clock):
+    fetcher = make_fetcher({GBFS_URL: gbfs_v2(), STATUS_URL: status(ttl=30)})
+    first = fetcher.feed("demo", "station_status")
+    assert fetcher.feed("demo", "station_status") is first
+    assert fetcher._session.calls == [GBFS_URL, STATUS_URL]
+
+    clock.value += 31
+    fetcher._session.responses[STATUS_URL] = status(bikes=2)
+    assert fetcher.feed("demo", "station_status")["data"]["stations"][0]["num_bikes_available"] == 2
+    # gbfs.json est encore valide : seul le flux expiré est relu
+    assert fetcher._session.calls == [GBFS_URL, STATUS_URL, STATUS_URL]
+
+
+def test_failure_serves_last_payload_and_backs_off(clock):
+    fetcher = make_fetcher({GBFS_URL: gbfs_v2(), STATUS_URL: status(ttl=10)})
+    good = fetcher.feed("demo", "station_status")
+
+    clock.value += 11
+    fetcher._session.responses[STATUS_URL] = requests.ConnectionError("hors ligne")
+    assert fetcher.feed("demo", "station_status") is good
+    calls = len(fetcher._session.calls)
+
+    # Pendant le backoff, pas de nouvel appel réseau
+    clock.value += systems.BACKOFF_BASE - 1
+    assert fetcher.feed("demo", "station_status") is good
+    assert len(fetcher._session.calls) == calls
+
+    # Backoff exponentiel après un deuxième échec
+    clock.value += 1
+    fetcher.feed("demo", "station_status")
+    entry = fetcher._entry("demo", "station_status")
+    assert entry.failures == 2
+    assert entry.retry_at == clock.value + 2 * systems.BACKOFF_BASE
+
+    # Retour à la normale
+    clock.value += 2 * systems.BACKOFF_BASE
+    fetcher._session.responses[STATUS_URL] = status(bikes=5)
+    assert fetcher.feed("demo", "station_status")["data"]["stations"][0]["num_bikes_available"] == 5
+    assert entry.failures == 0
+
+
+def test_failure_without_payload_raises_until_retry(clock):
+    fetcher = make_fetcher({GBFS_URL: gbfs_v2(), STATUS_URL: requests.Timeout("lent")})
+    with pytest.raises(requests.Timeout):
+        fetcher.feed("demo", "station_status")
+    calls = len(fetcher._session.calls)
+    with pytest.raises(requests.Timeout):
+        fetcher.feed("demo", "station_status")
+    assert len(fetcher._session.calls) == calls
+
+
+def test_fetch_all_reports_systems_without_data(clock):
+    fetcher = make_fetcher({GBFS_URL: gbfs_v2(), STATUS_URL: status()})
+    result = fetcher.fetch_all(["demo"], feeds=("station_status", "station_information"))
+    assert result.payloads == {}
+    assert "station_information" in result.errors["demo"]
+
+    result = fetcher.fetch_all(["demo"], feeds=("station_status",))
+    assert result.errors == {}
+    assert result.payloads["demo"]["station_status"]["ttl"] == 30
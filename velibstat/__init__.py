@@ -0,0 +1 @@
+"""Briques de calcul partagées par les pages Vélibstat."""
@@ -0,0 +1,320 @@
+"""Service HTTP des agrégats Vélibstat, sans exécuter les pages Streamlit.
+
+    python -m velibstat.api --port 8502
+
+Routes (GET) :
+
+- /api/network : totaux du réseau (page d'accueil) ;
+- /api/departements : métriques par département (page Ville) ;
+- /api/stations/top?days=7&n=10 : stations les plus actives (Generic_stats) ;
+- /api/bikes/top?days=7&n=10 : vélos les plus utilisés (Generic_stats) ;
+- /api/stations/<code>/history?days=1 : relevés d'une station (Station).
+
+Tout autre paramètre est refusé (400), et une station absente du flux GBFS
+renvoie 404 sans interroger BigQuery.
+
+Les tables sont renvoyées en JSON (une liste d'objets) ou en Parquet avec
+`?format=parquet`. Chaque réponse porte un ETag, empreinte de son contenu :
+un client qui renvoie `If-None-Match` reçoit 304 tant que les données n'ont
+pas changé. Sources et réponses sont mises en cache avec les mêmes durées
+que les pages ; les identifiants BigQuery sont lus dans le même
+.streamlit/secrets.toml.
+"""
+import argparse
+import hashlib
+import io
+import json
+import logging
+import re
+import threading
+import time
+import tomllib
+from collections import OrderedDict
+from dataclasses import asdict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from velibstat import gbfs, geo, network, pipelines, quality, queries, systems, trips
+
+logger = logging.getLogger("velibstat.api")
+
+SECRETS_PATH = Path(".streamlit") / "secrets.toml"
+TRIP_DAYS = 30
+
+
+class BadRequest(Exception):
+    pass
+
+
+class NotFound(Exception):
+    pass
+
+
+class Unavailable(Exception):
+    pass
+
+
+class TTLCache:
+    """Valeurs calculées à la demande et conservées `ttl` secondes.
+
+    Un seul calcul à la fois par clé : les requêtes concurrentes attendent
+    son résultat au lieu de le refaire. Les entrées expirées sont purgées à
+    chaque ajout et, au-delà de `max_entries`, les moins récemment lues sont
+    écartées.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, key):
+        item = self._items.get(key)
+        if item is not None and item[0] > time.monotonic():
+            self._items.move_to_end(key)
+            return item
+        return None
+
+    def get(self, key, ttl: float, compute):
+        with self._lock:
+            item = self._fresh(key)
+            if item is not None:
+                return item[1]
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                item = self._fresh(key)
+            if item is not None:
+                return item[1]
+            try:
+                value = compute()
+                with self._lock:
+                    self._items[key] = (time.monotonic() + ttl, value)
+                    self._items.move_to_end(key)
+                    self._evict()
+                return value
+            finally:
+                with self._lock:
+                    self._locks.pop(key, None)
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [key for key, (expires, _) in self._items.items() if expires <= now]:
+            del self._items[key]
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def expires_in(self, key) -> float:
+        item = self._items.get(key)
+        return max(item[0] - time.monotonic(), 0) if item else 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+class Sources:
+    """Données brutes partagées par toutes les routes (GBFS, BigQuery, communes)."""
+
+    def __init__(self, service_account_info: dict = None):
+        self.service_account_info = service_account_info
+        self.cache = TTLCache()
+        self.fetcher = systems.SystemFetcher()
+
+    def client(self):
+        if self.service_account_info is None:
+            raise Unavailable("identifiants BigQuery absents (gcp_service_account)")
+        return self.cache.get("client", float("inf"), lambda: queries.make_client(self.service_account_info))
+
+    def live(self) -> pipelines.LiveStations:
+        status = self.fetcher.feed(systems.DEFAULT_SYSTEM, "station_status")
+        info = self.fetcher.feed(systems.DEFAULT_SYSTEM, "station_information")
+        return pipelines.live_stations(status, info)
+
+    def communes(self) -> list:
+        return self.cache.get("communes", float("inf"), geo.load_communes)[0]
+
+    def trips(self) -> pd.DataFrame:
+        """Trajets des TRIP_DAYS derniers jours, sans les trajets signalés."""
+        def load():
+            df = queries.load_trips(self.client(), TRIP_DAYS)
+            return df[quality.valid_mask(quality.flag_trips(df))]
+
+        return self.cache.get("trips", 24 * 60 * 60, load)
+
+
+# ----------------------------------------------------
+# Routes
+# ----------------------------------------------------
+def _int_param(params: dict, name: str, default: int, low: int, high: int) -> int:
+    value = params.get(name, [str(default)])[0]
+    if not value.isdigit() or not low <= int(value) <= high:
+        raise BadRequest(f"{name} doit être un entier entre {low} et {high}")
+    return int(value)
+
+
+def network_route(sources: Sources, params: dict, **_):
+    live = sources.live()
+    totals = network.network_totals(live.status, live.info)
+    return {**asdict(totals), "last_updated": live.last_updated.isoformat()}
+
+
+def departements_route(sources: Sources, params: dict, **_):
+    return pipelines.ville(sources.live(), sources.communes()).metrics
+
+
+def top_stations_route(sources: Sources, params: dict, **_):
+    days = _int_param(params, "days", 7, 1, TRIP_DAYS)
+    n = _int_param(params, "n", 10, 1, 1000)
+    df = trips.filter_period(sources.trips(), days)
+    return trips.station_activity(df).nlargest(n, "total_activity")
+
+
+def top_bikes_route(sources: Sources, params: dict, **_):
+    days = _int_param(params, "days", 7, 1, TRIP_DAYS)
+    n = _int_param(params, "n", 10, 1, 1000)
+    return trips.bike_counts(trips.filter_period(sources.trips(), days)).head(n)
+
+
+def history_route(sources: Sources, params: dict, code: str):
+    days = _int_param(params, "days", 1, 1, 7)
+    # Requête BigQuery facturée : seulement pour une station existante
+    if int(code) not in set(gbfs.station_codes(sources.live().stations, "stationCode_info")):
+        raise NotFound(f"station inconnue : {code}")
+    return queries.load_stations_history(sources.client(), [int(code)], days)
+
+
+# (motif, fonction, paramètres acceptés, durée de cache des réponses en secondes)
+ROUTES = [
+    (re.compile(r"^/api/network$"), network_route, (), 60),
+    (re.compile(r"^/api/departements$"), departements_route, (), 60),
+    (re.compile(r"^/api/stations/top$"), top_stations_route, ("days", "n"), 60 * 60),
+    (re.compile(r"^/api/bikes/top$"), top_bikes_route, ("days", "n"), 60 * 60),
+    (re.compile(r"^/api/stations/(?P<code>\d+)/history$"), history_route, ("days",), 30 * 60),
+]
+FORMATS = ("json", "parquet")
+
+
+def encode(data, fmt: str):
+    """(corps, type de contenu, ETag) d'une réponse."""
+    if fmt == "parquet":
+        if not isinstance(data, pd.DataFrame):
+            raise BadRequest("format parquet réservé aux tables")
+        buffer = io.BytesIO()
+        data.to_parquet(buffer, index=False)
+        body, content_type = buffer.getvalue(), "application/vnd.apache.parquet"
+    elif isinstance(data, pd.DataFrame):
+        body = data.to_json(orient="records", date_format="iso", force_ascii=False).encode()
+        content_type = "application/json; charset=utf-8"
+    else:
+        body = json.dumps(data, ensure_ascii=False, default=str).encode()
+        content_type = "application/json; charset=utf-8"
+    return body, content_type, f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+# ----------------------------------------------------
+# Serveur
+# ----------------------------------------------------
+class Handler(BaseHTTPRequestHandler):
+    sources: Sources = None
+    response_cache = TTLCache()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        fmt = params.get("format", ["json"])[0]
+
+        for pattern, route, accepted, ttl in ROUTES:
+            match = pattern.match(url.path)
+            if match:
+                break
+        else:
+            return self._error(HTTPStatus.NOT_FOUND, f"route inconnue : {url.path}")
+
+        unknown = set(params) - set(accepted) - {"format"}
+        if unknown:
+            return self._error(HTTPStatus.BAD_REQUEST, f"paramètres inconnus : {', '.join(sorted(unknown))}")
+        if fmt not in FORMATS:
+            return self._error(HTTPStatus.BAD_REQUEST, f"format inconnu : {fmt}")
+
+        # Clé limitée aux paramètres de la route (première valeur de chacun)
+        key = (url.path, fmt) + tuple(params.get(name, [None])[0] for name in accepted)
+        try:
+            body, content_type, etag = self.response_cache.get(
+                key, ttl, lambda: encode(route(self.sources, params, **match.groupdict()), fmt)
+            )
+        except BadRequest as exc:
+            return self._error(HTTPStatus.BAD_REQUEST, str(exc))
+        except NotFound as exc:
+            return self._error(HTTPStatus.NOT_FOUND, str(exc))
+        except Unavailable as exc:
+            return self._error(HTTPStatus.SERVICE_UNAVAILABLE, str(exc))
+        except Exception as exc:
+            logger.exception("échec de %s", self.path)
+            return self._error(HTTPStatus.BAD_GATEWAY, f"source indisponible : {exc}")
+
+        max_age = int(self.response_cache.expires_in(key))
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", f"max-age={max_age}")
+            self.end_headers()
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", f"max-age={max_age}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: HTTPStatus, message: str):
+        body = json.dumps({"error": message}, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.info("%s %s", self.address_string(), format % args)
+
+
+def load_service_account(path: Path = SECRETS_PATH):
+    """Section gcp_service_account du fichier de secrets Streamlit, si présent."""
+    if not Path(path).exists():
+        return None
+    with open(path, "rb") as f:
+        return tomllib.load(f).get("gcp_service_account")
+
+
+def make_server(host: str, port: int, sources: Sources) -> ThreadingHTTPServer:
+    handler = type("VelibstatHandler", (Handler,), {"sources": sources, "response_cache": TTLCache()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--secrets", type=Path, default=SECRETS_PATH, help="fichier secrets.toml de Streamlit")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    server = make_server(args.host, args.port, Sources(load_service_account(args.secrets)))
+    logger.info("Vélibstat API sur http://%s:%d/api/network", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Sources de données mises en cache pour les pages Streamlit.
+
+Avec `debug`, seul module du paquet à dépendre de Streamlit : il enveloppe les fonctions de
+récupération (GBFS, BigQuery, contours des communes) dans st.cache_data /
+st.cache_resource, étape par étape.
+"""
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from velibstat import gbfs, geo, occupancy, pipelines, queries, systems
+
+
+@st.cache_resource
+def bigquery_client():
+    return queries.make_client(st.secrets["gcp_service_account"])
+
+
+# Vélib' passe par le même registre et le même cache que les autres systèmes :
+# URL déduites de gbfs.json, validité d'après le ttl de chaque flux
+def station_status() -> dict:
+    return system_fetcher().feed(systems.DEFAULT_SYSTEM, "station_status")
+
+
+def station_information() -> dict:
+    return system_fetcher().feed(systems.DEFAULT_SYSTEM, "station_information")
+
+
+def live_stations() -> pipelines.LiveStations:
+    """Stations temps réel, normalisées une fois par couple de flux."""
+    status, info = station_status(), station_information()
+    return _live_stations(gbfs.last_updated(status), gbfs.last_updated(info), status, info)
+
+
+# Les horodatages des deux flux suffisent comme clé, sans hacher les payloads
+@st.cache_data(max_entries=4, show_spinner=False)
+def _live_stations(status_version: int, info_version: int, _status: dict, _info: dict) -> pipelines.LiveStations:
+    return pipelines.live_stations(_status, _info)
+
+
+# Cache et backoff propres à chaque système, partagés entre les sessions
+@st.cache_resource
+def system_fetcher():
+    return systems.SystemFetcher()
+
+
+@st.cache_resource
+def communes():
+    return geo.load_communes()
+
+
+# Positions inchangées tant que station_information ne change pas : sa version
+# suffit comme clé, sans hacher les stations ni relocaliser à chaque rerun
+@st.cache_data(max_entries=4, show_spinner=False)
+def station_areas(info_version: int, _info: pd.DataFrame) -> pd.DataFrame:
+    """`departement_code` et `ville` de chaque station, indexés par station_id."""
+    located = pipelines.locate(_info[["station_id", "lon", "lat"]], communes()[0])
+    return located.set_index("station_id")[["departement_code", "ville"]]
+
+
+# Intègre les jours manquants au tenseur sur disque puis le relit en memmap ;
+# au plus une requête BigQuery par rafraîchissement, un jour incomplet étant
+# relu au suivant
+@st.cache_resource(ttl=6 * 60 * 60, show_spinner="Mise à jour du tenseur d'occupation…")
+def occupancy_tensor():
+    tensor = occupancy.load()
+    days = occupancy.days_to_update(tensor, datetime.now(occupancy.ZONE).date())
+    if days is not None:
+        hourly = queries.load_hourly_availability_range(bigquery_client(), *days)
+        updated = occupancy.update(tensor, hourly, days[1])
+        if updated is not tensor:
+            occupancy.save(updated)
+            tensor = occupancy.load()
+    return tensor
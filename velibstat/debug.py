@@ -0,0 +1,55 @@
+"""Panneau de mesure des performances dans la barre latérale.
+
+Activé par `?debug=1` dans l'URL (`?debug=memory` pour le pic mémoire) ou par
+la variable d'environnement VELIBSTAT_PROFILE. Sans activation, ces
+fonctions ne font qu'un test booléen. Le pic mémoire n'est fiable qu'avec une
+seule session active (voir instrumentation).
+"""
+import pandas as pd
+import streamlit as st
+
+from velibstat import instrumentation
+
+
+def start_page():
+    """À appeler juste après st.set_page_config."""
+    mode = st.query_params.get("debug", "").strip().lower()
+    if mode in ("", "0", "false"):
+        instrumentation.start_run()
+    else:
+        instrumentation.start_run(enabled=True, memory=mode == "memory")
+    if instrumentation.is_enabled():
+        instrumentation.configure_logging()
+
+
+def debug_panel():
+    """À appeler en fin de page : tableau des étapes mesurées pendant l'exécution."""
+    instrumentation.finish_run()
+    if not instrumentation.is_enabled():
+        return
+
+    total_ms = instrumentation.elapsed_ms()
+    records = instrumentation.records()
+    with st.sidebar.expander("Performances", expanded=True):
+        if not records:
+            st.caption("Aucune étape mesurée (tout venait du cache).")
+        else:
+            df = pd.DataFrame([{
+                "étape": r.name,
+                "ms": round(r.wall_ms, 1),
+                "lignes": r.rows,
+                "pic Mo": None if r.peak_mb is None else round(r.peak_mb, 1),
+                "détails": ", ".join(f"{k}={v}" for k, v in r.extra.items()),
+            } for r in records])
+            st.dataframe(df, hide_index=True, use_container_width=True)
+
+        # Les étapes imbriquées se recouvrent : seules les étapes de premier
+        # niveau sont comparables au temps total, d'où un simple ordre de grandeur.
+        st.metric("Exécution du script", f"{total_ms:.0f} ms")
+        st.caption(f"{len(records)} étape(s) mesurée(s) ; le reste est du rendu ou du cache Streamlit.")
+
+
+def stop():
+    """st.stop() après avoir affiché le panneau et terminé l'exécution."""
+    debug_panel()
+    st.stop()
@@ -0,0 +1,132 @@
+"""Prévision de disponibilité des vélos par station.
+
+Le modèle combine, pour chaque station :
+
+- une référence saisonnière : nombre moyen de vélos par heure de la semaine
+  (168 créneaux), rétréci vers la moyenne de la station quand un créneau a
+  peu d'observations ;
+- une correction de tendance récente : l'écart entre l'état courant et la
+  référence s'amortit exponentiellement avec l'horizon, à une demi-vie
+  estimée sur l'autocorrélation des résidus.
+
+L'entraînement est entièrement vectorisé (np.bincount sur toutes les stations
+à la fois) et la prévision n'est qu'une lecture dans deux tableaux.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from velibstat.instrumentation import instrumented
+
+HOURS_PER_WEEK = 7 * 24
+TIMEZONE = "Europe/Paris"
+
+
+@dataclass
+class ForecastModel:
+    station_ids: np.ndarray  # identifiants triés, int64
+    baseline: np.ndarray     # (stations, 168) vélos attendus, float32
+    p_bike: np.ndarray       # (stations, 168) probabilité d'au moins un vélo, float32
+    half_life_min: float     # demi-vie de la correction de tendance
+
+
+def hour_of_week(timestamps) -> np.ndarray:
+    """Créneau 0..167 (lundi 0h = 0) en heure de Paris."""
+    ts = pd.DatetimeIndex(pd.to_datetime(timestamps))
+    if ts.tz is None:
+        ts = ts.tz_localize("UTC")
+    ts = ts.tz_convert(TIMEZONE)
+    return (ts.dayofweek * 24 + ts.hour).to_numpy()
+
+
+def estimate_half_life(station_idx, timestamps, residuals, default=90.0) -> float:
+    """Demi-vie (minutes) des écarts à la référence, d'après l'autocorrélation à 1 h."""
+    order = np.lexsort((timestamps, station_idx))
+    s, t, r = station_idx[order], timestamps[order], residuals[order]
+    consecutive = (s[1:] == s[:-1]) & (np.diff(t) == np.timedelta64(1, "h"))
+    if not consecutive.any():
+        return default
+
+    r0, r1 = r[:-1][consecutive], r[1:][consecutive]
+    denom = np.dot(r0, r0)
+    if denom == 0:
+        return default
+
+    rho = float(np.clip(np.dot(r0, r1) / denom, 0.01, 0.99))
+    return 60 * np.log(0.5) / np.log(rho)
+
+
+@instrumented()
+def train(history: pd.DataFrame, prior_weight: float = 2.0) -> ForecastModel:
+    """Entraîne le modèle pour toutes les stations en une passe.
+
+    `history` contient une ligne par station et par heure : `station_id`,
+    `file_date` (début de l'heure), `nb_available` (vélos disponibles en
+    moyenne) et, optionnellement, `has_bike` (part du temps avec au moins un
+    vélo). Sans `has_bike`, elle est déduite de `nb_available > 0`.
+    """
+    station_ids, station_idx = np.unique(history["station_id"].to_numpy(), return_inverse=True)
+    n_stations = len(station_ids)
+    size = n_stations * HOURS_PER_WEEK
+
+    values = history["nb_available"].to_numpy(dtype=np.float64)
+    if "has_bike" in history:
+        has_bike = history["has_bike"].to_numpy(dtype=np.float64)
+    else:
+        has_bike = (values > 0).astype(np.float64)
+
+    slot = station_idx * HOURS_PER_WEEK + hour_of_week(history["file_date"])
+
+    counts = np.bincount(slot, minlength=size)
+    sums = np.bincount(slot, weights=values, minlength=size)
+    sums_bike = np.bincount(slot, weights=has_bike, minlength=size)
+
+    # Moyennes par station : a priori pour les créneaux peu observés
+    station_counts = np.bincount(station_idx, minlength=n_stations)
+    station_mean = np.bincount(station_idx, weights=values, minlength=n_stations) / station_counts
+    station_p = np.bincount(station_idx, weights=has_bike, minlength=n_stations) / station_counts
+
+    shrunk = counts + prior_weight
+    baseline = (sums + prior_weight * np.repeat(station_mean, HOURS_PER_WEEK)) / shrunk
+    p_bike = (sums_bike + prior_weight * np.repeat(station_p, HOURS_PER_WEEK)) / shrunk
+
+    residuals = values - baseline[slot]
+    timestamps = pd.to_datetime(history["file_date"]).to_numpy(dtype="datetime64[ns]")
+    half_life = estimate_half_life(station_idx, timestamps, residuals)
+
+    return ForecastModel(
+        station_ids=station_ids.astype(np.int64),
+        baseline=baseline.reshape(n_stations, HOURS_PER_WEEK).astype(np.float32),
+        p_bike=p_bike.reshape(n_stations, HOURS_PER_WEEK).astype(np.float32),
+        half_life_min=half_life,
+    )
+
+
+@instrumented()
+def predict(model: ForecastModel, station_ids, current_bikes, now, horizon_min: float = 30) -> pd.DataFrame:
+    """Prévision à `horizon_min` minutes pour les stations demandées.
+
+    `current_bikes` est l'état temps réel (API GBFS) des mêmes stations. Les
+    stations inconnues du modèle reçoivent NaN.
+    """
+    station_ids = np.asarray(station_ids, dtype=np.int64)
+    current = np.asarray(current_bikes, dtype=np.float64)
+
+    idx = np.searchsorted(model.station_ids, station_ids)
+    idx = np.minimum(idx, len(model.station_ids) - 1)
+    known = model.station_ids[idx] == station_ids
+
+    now = pd.Timestamp(now)
+    how_now, how_target = hour_of_week([now, now + pd.Timedelta(minutes=horizon_min)])
+
+    weight = 0.5 ** (horizon_min / model.half_life_min)
+    residual = current - model.baseline[idx, how_now]
+    expected = np.maximum(model.baseline[idx, how_target] + weight * residual, 0)
+    p_bike = weight * (current > 0) + (1 - weight) * model.p_bike[idx, how_target]
+
+    return pd.DataFrame({
+        "station_id": station_ids,
+        "expected_bikes": np.where(known, expected, np.nan),
+        "p_bike": np.where(known, p_bike, np.nan),
+    })
@@ -0,0 +1,76 @@
+"""Récupération et normalisation des flux GBFS Vélib (station_status / station_information)."""
+import numpy as np
+import pandas as pd
+import requests
+
+from velibstat.instrumentation import instrumented, stage
+
+URL_GBFS = "https://velib-metropole-opendata.smovengo.cloud/opendata/Velib_Metropole/gbfs.json"
+
+STATUS_UNUSED_COLUMNS = ["station_opening_hours", "numBikesAvailable", "numDocksAvailable"]
+INFO_UNUSED_COLUMNS = ["station_opening_hours", "rental_methods"]
+
+
+def fetch(url: str, timeout: float = 10, session: requests.Session = None) -> dict:
+    with stage("gbfs.fetch", url=url) as record:
+        response = (session or requests).get(url, timeout=timeout)
+        response.raise_for_status()
+        data = response.json()
+        if record is not None:
+            record.extra["bytes"] = len(response.content)
+            record.rows = len(data.get("data", {}).get("stations", []))
+    return data
+
+
+def last_updated(payload: dict) -> int:
+    """Horodatage du flux : `lastUpdatedOther` (Vélib) ou `last_updated` (GBFS,
+    entier jusqu'à la v2, date ISO en v3)."""
+    value = payload.get("lastUpdatedOther", payload.get("last_updated", 0))
+    if isinstance(value, str):
+        return int(pd.Timestamp(value).timestamp())
+    return int(value)
+
+
+def bike_type_counts(stations: list, bike_type: str) -> np.ndarray:
+    """Vélos d'un type par station, d'après `num_bikes_available_types`
+    (liste de dicts `{"mechanical": n}`, `{"ebike": n}`) ; 0 si absent."""
+    return np.fromiter(
+        (
+            sum(item.get(bike_type, 0) for item in types if isinstance(item, dict)) if isinstance(types, list) else 0
+            for types in (station.get("num_bikes_available_types") for station in stations)
+        ),
+        dtype=np.int64,
+        count=len(stations),
+    )
+
+
+@instrumented()
+def normalize_status(data: dict) -> pd.DataFrame:
+    """station_status.json -> une ligne par station, vélos méca / élec séparés."""
+    stations = data["data"]["stations"]
+    df = pd.DataFrame(stations).drop(columns="num_bikes_available_types", errors="ignore")
+    # Hors Vélib, le détail par type de vélo est souvent absent : 0 partout
+    df["mechanical_available"] = bike_type_counts(stations, "mechanical")
+    df["ebike_available"] = bike_type_counts(stations, "ebike")
+    return df.drop(columns=STATUS_UNUSED_COLUMNS, errors="ignore")
+
+
+@instrumented()
+def normalize_information(data: dict) -> pd.DataFrame:
+    """station_information.json -> une ligne par station."""
+    df = pd.DataFrame(data["data"]["stations"])
+    return df.drop(columns=INFO_UNUSED_COLUMNS, errors="ignore")
+
+
+@instrumented()
+def merge_status_information(df_status: pd.DataFrame, df_info: pd.DataFrame) -> pd.DataFrame:
+    return df_status.merge(df_info, on="station_id", suffixes=("_status", "_info"))
+
+
+def station_codes(df: pd.DataFrame, column: str = "stationCode") -> pd.Series:
+    """Codes station numériques (identifiant des tables BigQuery), index conservé.
+
+    Les stations dont le code n'est pas numérique sont écartées.
+    """
+    codes = df[column].astype(str)
+    return codes[codes.str.isdigit()].astype(int)
@@ -0,0 +1,78 @@
+"""Rattachement des stations aux communes et départements."""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from shapely import STRtree, points
+from shapely.geometry import shape
+
+from velibstat.instrumentation import instrumented
+
+COMMUNES_PATH = Path(__file__).resolve().parent.parent / "geo-limit" / "communes.json"
+
+
+@instrumented()
+def load_communes(path=COMMUNES_PATH):
+    """Charge les contours des communes.
+
+    Retourne la liste des communes valides (nom, code département, polygone)
+    et la liste des messages d'erreur rencontrés pendant la lecture.
+    """
+    with open(path) as f:
+        communes_data = json.load(f)
+
+    communes, errors = [], []
+    for entry in communes_data:
+        # Si l'entrée est une liste, on itère sur ses éléments
+        communes_list = entry if isinstance(entry, list) else [entry]
+
+        for commune in communes_list:
+            if not isinstance(commune, dict):
+                errors.append(f"Entrée invalide : {commune}")
+                continue
+
+            departement = commune.get("departement")
+            if not departement:
+                errors.append(f"Pas de département pour la commune {commune.get('nom', 'Inconnu')}")
+                continue
+
+            try:
+                poly = shape(commune["contour"])
+            except Exception as e:
+                errors.append(f"Erreur création polygone pour {commune.get('nom')}: {e}")
+                continue
+
+            communes.append({
+                "ville": commune.get("nom"),
+                "departement_code": departement.get("code"),
+                "polygon": poly,
+            })
+
+    return communes, errors
+
+
+@instrumented()
+def locate_stations(lon, lat, communes) -> pd.DataFrame:
+    """Associe chaque point (lon, lat) à son département et à sa commune.
+
+    Les polygones sont indexés dans un STRtree : toutes les stations sont
+    rattachées en une seule requête vectorisée au lieu d'un balayage des
+    polygones station par station. Les points hors de toute commune
+    reçoivent None.
+    """
+    lon = np.asarray(lon, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    tree = STRtree([c["polygon"] for c in communes])
+    point_idx, commune_idx = tree.query(points(lon, lat), predicate="within")
+
+    # Une station en limite de deux communes garde la première trouvée
+    point_idx, first = np.unique(point_idx, return_index=True)
+    commune_idx = commune_idx[first]
+
+    villes = np.full(len(lon), None, dtype=object)
+    deps = np.full(len(lon), None, dtype=object)
+    villes[point_idx] = [communes[i]["ville"] for i in commune_idx]
+    deps[point_idx] = [communes[i]["departement_code"] for i in commune_idx]
+
+    return pd.DataFrame({"departement_code": deps, "ville": villes})
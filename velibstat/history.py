@@ -0,0 +1,18 @@
+"""Mise en forme de l'historique fact_station_status."""
+import pandas as pd
+
+
+def station_history(df_hist: pd.DataFrame) -> pd.DataFrame:
+    """Historique d'une seule station, indexé par date de relevé."""
+    return df_hist.drop(columns=["station_id"]).sort_values("file_date").set_index("file_date")
+
+
+def align_histories(df_hist: pd.DataFrame, column: str, labels: dict, freq: str) -> pd.DataFrame:
+    """Une colonne par station, sur une grille temporelle commune."""
+    aligned = (
+        df_hist.assign(file_date=df_hist["file_date"].dt.floor(freq))
+        .pivot_table(index="file_date", columns="station_id", values=column, aggfunc="mean")
+    )
+    grid = pd.date_range(aligned.index.min(), aligned.index.max(), freq=freq)
+    aligned = aligned.reindex(grid).ffill(limit=1)
+    return aligned.rename(columns=labels)
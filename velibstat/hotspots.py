@@ -0,0 +1,137 @@
+"""Détection des stations à rééquilibrer.
+
+Trois signaux sont combinés, station par station et de façon vectorisée :
+
+- l'état temps réel (taux de remplissage num_bikes_available / capacity) ;
+- la persistance : part des relevés récents où la station était vide ou
+  pleine, initialisée depuis fact_station_status puis mise à jour à chaque
+  nouveau flux GBFS par moyenne mobile exponentielle, pondérée par le temps
+  écoulé : la constante de temps est la durée de l'historique, qui garde donc
+  son poids quelle que soit la fréquence des rafraîchissements ;
+- le flux net des trajets (arrivées - départs) rapporté à la capacité.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from velibstat.instrumentation import instrumented
+
+
+@dataclass
+class HotspotState:
+    station_ids: np.ndarray  # identifiants triés, int64
+    empty_share: np.ndarray  # part du temps sans vélo
+    full_share: np.ndarray   # part du temps sans borne libre
+    last_updated: int        # horodatage du dernier flux GBFS intégré
+    window_s: float          # durée de l'historique, constante de temps de la moyenne
+
+
+@instrumented()
+def init_state(snapshot_counts: pd.DataFrame, capacity: pd.Series, days: int, last_updated: int) -> HotspotState:
+    """État initial depuis l'historique des `days` derniers jours.
+
+    `snapshot_counts` contient une ligne par station et par nombre de vélos
+    observé : `station_id`, `nb_available`, `nb_snapshots`. `capacity` est
+    indexée par station_id. `last_updated` est l'horodatage de la fin de
+    l'historique (le flux GBFS courant).
+    """
+    counts = snapshot_counts.assign(capacity=snapshot_counts["station_id"].map(capacity))
+    counts = counts[counts["capacity"] > 0]
+    n = counts["nb_snapshots"]
+    grouped = pd.DataFrame({
+        "station_id": counts["station_id"],
+        "total": n,
+        "empty": n.where(counts["nb_available"] <= 0, 0),
+        "full": n.where(counts["nb_available"] >= counts["capacity"], 0),
+    }).groupby("station_id").sum()
+
+    return HotspotState(
+        station_ids=grouped.index.to_numpy(dtype=np.int64),
+        empty_share=(grouped["empty"] / grouped["total"]).to_numpy(),
+        full_share=(grouped["full"] / grouped["total"]).to_numpy(),
+        last_updated=last_updated,
+        window_s=days * 24 * 60 * 60,
+    )
+
+
+@instrumented()
+def update_state(state: HotspotState, live: pd.DataFrame, last_updated: int) -> HotspotState:
+    """Intègre un relevé temps réel dans l'état.
+
+    `live` contient `station_id`, `num_bikes_available`, `num_docks_available`.
+    Le relevé pèse 1 - exp(-Δt / window_s), Δt étant le temps écoulé depuis le
+    flux précédent : une heure de flux toutes les minutes pèse autant qu'un
+    seul flux une heure plus tard. Un même flux (même `last_updated`) n'est
+    intégré qu'une fois ; les stations absentes de l'état y sont ajoutées avec
+    leur relevé courant.
+    """
+    if last_updated <= state.last_updated:
+        return state
+    alpha = -np.expm1(-(last_updated - state.last_updated) / state.window_s)
+
+    live_ids = live["station_id"].to_numpy(dtype=np.int64)
+    is_empty = (live["num_bikes_available"] <= 0).to_numpy(dtype=float)
+    is_full = (live["num_docks_available"] <= 0).to_numpy(dtype=float)
+
+    station_ids = np.union1d(state.station_ids, live_ids)
+    empty_share = np.full(len(station_ids), np.nan)
+    full_share = np.full(len(station_ids), np.nan)
+    known = np.searchsorted(station_ids, state.station_ids)
+    empty_share[known] = state.empty_share
+    full_share[known] = state.full_share
+
+    idx = np.searchsorted(station_ids, live_ids)
+    empty_share[idx] = np.where(np.isnan(empty_share[idx]), is_empty, (1 - alpha) * empty_share[idx] + alpha * is_empty)
+    full_share[idx] = np.where(np.isnan(full_share[idx]), is_full, (1 - alpha) * full_share[idx] + alpha * is_full)
+
+    return HotspotState(
+        station_ids=station_ids,
+        empty_share=np.nan_to_num(empty_share),
+        full_share=np.nan_to_num(full_share),
+        last_updated=last_updated,
+        window_s=state.window_s,
+    )
+
+
+@instrumented()
+def rank_hotspots(state: HotspotState, live: pd.DataFrame, flows: pd.DataFrame, days: int) -> pd.DataFrame:
+    """Classe les stations par déséquilibre.
+
+    `live` contient `station_id`, `name`, `capacity`, `num_bikes_available`,
+    `num_docks_available` ; `flows` contient `station_id`, `nb_in`, `nb_out`
+    sur les `days` derniers jours.
+
+    Le score vaut la persistance (part du temps vide ou pleine), plus le flux
+    net quotidien en part de la capacité, plus 1 si la station est vide ou
+    pleine en ce moment. `besoin` indique s'il faut apporter ou retirer des
+    vélos.
+    """
+    df = live[["station_id", "name", "capacity", "num_bikes_available", "num_docks_available"]].copy()
+    df = df[df["capacity"] > 0]
+    ids = df["station_id"].to_numpy(dtype=np.int64)
+
+    # Stations absentes de l'état (ou état vide, faute d'historique) : persistance nulle
+    idx = np.searchsorted(state.station_ids, ids)
+    known = idx < len(state.station_ids)
+    known[known] = state.station_ids[idx[known]] == ids[known]
+    empty_share = np.zeros(len(ids))
+    full_share = np.zeros(len(ids))
+    empty_share[known] = state.empty_share[idx[known]]
+    full_share[known] = state.full_share[idx[known]]
+    df["empty_share"] = empty_share
+    df["full_share"] = full_share
+
+    df = df.merge(flows[["station_id", "nb_in", "nb_out"]], on="station_id", how="left")
+    df[["nb_in", "nb_out"]] = df[["nb_in", "nb_out"]].fillna(0)
+
+    df["fill_ratio"] = df["num_bikes_available"] / df["capacity"]
+    df["net_flow_per_day"] = (df["nb_in"] - df["nb_out"]) / days
+    drain = (df["net_flow_per_day"] / df["capacity"]).clip(-1, 1)
+
+    score_empty = df["empty_share"] + (-drain).clip(lower=0) + (df["num_bikes_available"] <= 0)
+    score_full = df["full_share"] + drain.clip(lower=0) + (df["num_docks_available"] <= 0)
+
+    df["score"] = np.maximum(score_empty, score_full)
+    df["besoin"] = np.where(score_empty >= score_full, "apporter des vélos", "retirer des vélos")
+    return df.sort_values("score", ascending=False).reset_index(drop=True)
@@ -0,0 +1,165 @@
+"""Mesure du temps, du volume et de la mémoire de chaque étape.
+
+Désactivée par défaut : `stage()` et `instrumented` se réduisent alors à un
+test booléen. Activation globale par la variable d'environnement
+VELIBSTAT_PROFILE (`1`, ou `memory` pour mesurer aussi le pic mémoire avec
+tracemalloc), ou pour une exécution donnée via `start_run()` / `finish_run()`.
+
+tracemalloc est global au processus : il ne tourne que tant qu'une exécution
+en mode mémoire est en cours, et son pic est partagé entre les threads. Les
+pics mémoire ne sont donc fiables qu'avec une seule session active.
+
+Chaque étape mesurée est journalisée en JSON sur le logger `velibstat.perf`
+et conservée dans la liste `records()` de l'exécution courante (une par
+thread, donc une par session Streamlit).
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+logger = logging.getLogger("velibstat.perf")
+
+_ENV = os.environ.get("VELIBSTAT_PROFILE", "").strip().lower()
+_ENV_ENABLED = _ENV not in ("", "0", "false")
+_ENV_MEMORY = _ENV == "memory"
+
+_local = threading.local()
+
+# Exécutions en mode mémoire en cours (jeton -> début), tous threads confondus
+MEMORY_RUN_TIMEOUT = 5 * 60
+_memory_runs = {}
+_memory_lock = threading.Lock()
+
+
+@dataclass
+class StageRecord:
+    name: str
+    wall_ms: float = 0.0
+    rows: int = None
+    peak_mb: float = None
+    extra: dict = field(default_factory=dict)
+
+
+def is_enabled() -> bool:
+    return getattr(_local, "enabled", _ENV_ENABLED)
+
+
+def start_run(enabled: bool = None, memory: bool = None):
+    """Démarre une nouvelle exécution (une exécution de page) sur ce thread.
+
+    En mode mémoire, tracemalloc est démarré pour tout le processus : à
+    arrêter par `finish_run()`.
+    """
+    finish_run()
+    _local.enabled = _ENV_ENABLED if enabled is None else enabled
+    _local.memory = _local.enabled and (_ENV_MEMORY if memory is None else memory)
+    _local.records = []
+    _local.start = time.perf_counter()
+    with _memory_lock:
+        # Exécutions mémoire interrompues sans finish_run() (exception, st.stop)
+        now = time.monotonic()
+        for token in [t for t, started in _memory_runs.items() if now - started > MEMORY_RUN_TIMEOUT]:
+            del _memory_runs[token]
+        if _local.memory:
+            _local.memory_token = object()
+            _memory_runs[_local.memory_token] = now
+        _sync_tracing()
+
+
+def finish_run():
+    """Termine l'exécution du thread ; arrête tracemalloc si plus aucune
+    exécution mémoire n'est en cours."""
+    token = getattr(_local, "memory_token", None)
+    if token is None:
+        return
+    _local.memory_token = None
+    with _memory_lock:
+        _memory_runs.pop(token, None)
+        _sync_tracing()
+
+
+def _sync_tracing():
+    if _memory_runs and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not _memory_runs and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def elapsed_ms() -> float:
+    """Temps écoulé depuis `start_run()`."""
+    return (time.perf_counter() - getattr(_local, "start", time.perf_counter())) * 1000
+
+
+def records() -> list:
+    return getattr(_local, "records", [])
+
+
+def _rows(result):
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+@contextmanager
+def stage(name: str, **extra):
+    """Mesure le bloc. Renvoie le StageRecord (None si désactivé) pour y ajouter
+    `rows` ou des informations dans `extra`.
+
+    Le pic mémoire des étapes imbriquées est approximatif : chaque étape remet
+    à zéro le pic de tracemalloc.
+    """
+    if not is_enabled():
+        yield None
+        return
+
+    record = StageRecord(name, extra=extra)
+    memory = getattr(_local, "memory", _ENV_MEMORY) and tracemalloc.is_tracing()
+    if memory:
+        start_current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.wall_ms = (time.perf_counter() - start) * 1000
+        if memory and tracemalloc.is_tracing():
+            record.peak_mb = max(tracemalloc.get_traced_memory()[1] - start_current, 0) / 2**20
+        if not hasattr(_local, "records"):
+            _local.records = []
+        _local.records.append(record)
+        logger.info(json.dumps(asdict(record), default=str))
+
+
+def instrumented(name: str = None):
+    """Décorateur : mesure chaque appel, `rows` = len() du résultat si possible."""
+    def decorator(fn):
+        stage_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return fn(*args, **kwargs)
+            with stage(stage_name) as record:
+                result = fn(*args, **kwargs)
+                record.rows = _rows(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def configure_logging(level=logging.INFO):
+    """Affiche les mesures sur la sortie d'erreur si rien n'est configuré."""
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(level)
@@ -0,0 +1,63 @@
+"""Couches de carte compactes pour st.map.
+
+Seules quatre colonnes partent vers le navigateur : `lat`, `lon` (arrondies
+au mètre), `color` (disponibilité) et `size` (rayon en mètres). Chaque
+station reste un point : st.map ne recalcule rien au zoom, un regroupement
+figé au zoom initial masquerait les stations une fois la carte agrandie.
+"""
+import numpy as np
+import pandas as pd
+
+from velibstat.instrumentation import instrumented
+
+STATION_PX = 4  # rayon d'une station au zoom initial
+
+TILE_PX = 256
+EARTH_CIRCUMFERENCE_M = 40_075_016.686
+
+COLOR_EMPTY = "#d62728"  # aucun vélo
+COLOR_LOW = "#ff7f0e"    # moins de LOW_RATIO de la capacité
+COLOR_OK = "#2ca02c"
+COLOR_FULL = "#1f77b4"   # aucune borne libre
+LOW_RATIO = 0.2
+
+LEGEND = (
+    f"<span style='color:{COLOR_EMPTY}'>●</span> vide · "
+    f"<span style='color:{COLOR_LOW}'>●</span> peu de vélos · "
+    f"<span style='color:{COLOR_OK}'>●</span> disponible · "
+    f"<span style='color:{COLOR_FULL}'>●</span> pleine"
+)
+
+
+def meters_per_pixel(lat, zoom: float) -> np.ndarray:
+    return EARTH_CIRCUMFERENCE_M * np.cos(np.radians(lat)) / (TILE_PX * 2.0 ** zoom)
+
+
+def availability_color(bikes, docks, capacity) -> np.ndarray:
+    bikes = np.asarray(bikes)
+    docks = np.asarray(docks)
+    capacity = np.asarray(capacity)
+    ratio = np.divide(bikes, capacity, out=np.zeros(len(bikes)), where=capacity > 0)
+    return np.select(
+        [bikes <= 0, docks <= 0, ratio < LOW_RATIO],
+        [COLOR_EMPTY, COLOR_FULL, COLOR_LOW],
+        default=COLOR_OK,
+    )
+
+
+@instrumented()
+def map_layer(stations: pd.DataFrame, zoom: int) -> pd.DataFrame:
+    """Points à passer à `st.map(..., zoom=zoom, color="color", size="size")`.
+
+    `stations` contient `lat`, `lon`, `num_bikes_available`,
+    `num_docks_available` et `capacity`.
+    """
+    lat = stations["lat"].to_numpy(dtype=np.float64)
+    return pd.DataFrame({
+        "lat": np.round(lat, 5),
+        "lon": stations["lon"].round(5).to_numpy(),
+        "color": availability_color(
+            stations["num_bikes_available"], stations["num_docks_available"], stations["capacity"]
+        ),
+        "size": np.round(STATION_PX * meters_per_pixel(lat, zoom)),
+    })
@@ -0,0 +1,44 @@
+"""Indicateurs agrégés sur l'ensemble des stations."""
+from dataclasses import dataclass
+
+import pandas as pd
+
+from velibstat.instrumentation import instrumented
+
+
+@dataclass
+class NetworkTotals:
+    nb_stations: int
+    nb_stations_available: int
+    capacity: int
+    nb_docks_available: int
+    nb_bikes_available: int
+    nb_mechanical_available: int
+    nb_ebike_available: int
+
+
+@instrumented()
+def network_totals(df_status: pd.DataFrame, df_info: pd.DataFrame) -> NetworkTotals:
+    """Totaux affichés sur la page d'accueil."""
+    return NetworkTotals(
+        nb_stations=int(df_status["station_id"].nunique()),
+        nb_stations_available=int(df_status.loc[df_status["is_installed"] == 1, "station_id"].nunique()),
+        capacity=int(df_info["capacity"].sum()),
+        nb_docks_available=int(df_status["num_docks_available"].sum()),
+        nb_bikes_available=int(df_status["num_bikes_available"].sum()),
+        nb_mechanical_available=int(df_status["mechanical_available"].sum()),
+        nb_ebike_available=int(df_status["ebike_available"].sum()),
+    )
+
+
+@instrumented()
+def departement_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """Métriques par département pour les stations localisées."""
+    return df.groupby("departement_code").agg(
+        total_stations=("station_id", "count"),
+        working_stations=("is_installed", lambda x: (x==1).sum()),
+        total_bikes=("num_bikes_available", "sum"),
+        mechanical_bikes=("mechanical_available", "sum"),
+        ebikes=("ebike_available", "sum"),
+        total_docks=("capacity", "sum")
+    ).reset_index()
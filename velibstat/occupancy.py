@@ -0,0 +1,191 @@
+"""Tenseur station × heure de la semaine des vélos disponibles.
+
+Pour chaque station et chacun des 168 créneaux (lundi 0h = 0, heure de
+Paris), le tenseur cumule la moyenne horaire de vélos disponibles (`sums`,
+float32) et le nombre d'heures observées (`counts`, uint16). Il s'enrichit
+jour par jour : seuls les jours postérieurs à `last_day` sont lus dans
+fact_station_status, et `last_day` n'avance que jusqu'au dernier jour dont
+toutes les heures ont des relevés. Un jour encore incomplet (ingestion en
+retard) n'est pas intégré : il sera relu à la mise à jour suivante.
+
+Sur disque, un fichier .npy par tableau et un meta.json : `load()` les relit
+en np.memmap, sans les charger en mémoire. Une moyenne sur un ensemble de
+stations et de créneaux n'est alors qu'une lecture de tranche.
+"""
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from velibstat.forecast import HOURS_PER_WEEK, TIMEZONE, hour_of_week
+from velibstat.instrumentation import instrumented
+
+DATA_DIR_ENV = "VELIBSTAT_DATA_DIR"
+DATA_DIR = Path(os.environ.get(DATA_DIR_ENV, Path(__file__).resolve().parent.parent / "data")) / "occupancy"
+
+DAYS = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
+COUNT_MAX = np.iinfo(np.uint16).max
+ZONE = ZoneInfo(TIMEZONE)
+
+
+@dataclass
+class OccupancyTensor:
+    station_ids: np.ndarray  # identifiants triés, int64
+    sums: np.ndarray         # (stations, 168) somme des moyennes horaires, float32
+    counts: np.ndarray       # (stations, 168) heures observées, uint16
+    last_day: date = None    # dernier jour intégré (heure de Paris)
+
+
+def empty() -> OccupancyTensor:
+    return OccupancyTensor(
+        station_ids=np.empty(0, dtype=np.int64),
+        sums=np.empty((0, HOURS_PER_WEEK), dtype=np.float32),
+        counts=np.empty((0, HOURS_PER_WEEK), dtype=np.uint16),
+    )
+
+
+def slot(day: int, hour: int) -> int:
+    """Créneau d'un jour (0 = lundi) et d'une heure."""
+    return day * 24 + hour
+
+
+def days_to_update(tensor: OccupancyTensor, today: date, max_days: int = 28):
+    """Jours complets (début, fin inclus) à intégrer, ou None si à jour."""
+    end = today - timedelta(days=1)
+    start = end - timedelta(days=max_days - 1)
+    if tensor.last_day is not None:
+        start = max(start, tensor.last_day + timedelta(days=1))
+    return None if start > end else (start, end)
+
+
+def _local_hours(timestamps) -> pd.DatetimeIndex:
+    """Heures (arrondies à l'heure inférieure) en heure de Paris."""
+    ts = pd.DatetimeIndex(pd.to_datetime(timestamps))
+    if ts.tz is None:
+        ts = ts.tz_localize("UTC")
+    # Arrondi en UTC : pas d'heure ambiguë au passage à l'heure d'hiver
+    return ts.tz_convert("UTC").floor("h").tz_convert(ZONE)
+
+
+def hours_in_day(day: date) -> int:
+    """Nombre d'heures du jour en heure de Paris (23 ou 25 aux changements d'heure)."""
+    start = pd.Timestamp(day).tz_localize(ZONE)
+    end = pd.Timestamp(day + timedelta(days=1)).tz_localize(ZONE)
+    return int((end - start) / pd.Timedelta(hours=1))
+
+
+def last_complete_day(file_dates, end: date):
+    """Dernier jour, au plus `end`, dont toutes les heures ont des relevés ; None sinon."""
+    hours = _local_hours(file_dates).unique()
+    if not len(hours):
+        return None
+    per_day = pd.Series(hours.date).value_counts()
+    complete = [day for day, n in per_day.items() if day <= end and n >= hours_in_day(day)]
+    return max(complete, default=None)
+
+
+@instrumented()
+def update(tensor: OccupancyTensor, hourly: pd.DataFrame, end: date) -> OccupancyTensor:
+    """Ajoute des relevés horaires au tenseur, jusqu'au jour `end` inclus.
+
+    `hourly` contient une ligne par station et par heure : `station_id`,
+    `file_date` (début de l'heure) et `nb_available` (vélos disponibles en
+    moyenne). Les nouvelles stations sont ajoutées au tenseur. Seuls les
+    jours jusqu'au dernier jour complet sont intégrés, et `last_day` devient
+    ce jour ; sans jour complet, le tenseur est renvoyé inchangé.
+    """
+    last_day = last_complete_day(hourly["file_date"], end)
+    if last_day is None:
+        return tensor
+    hourly = hourly[_local_hours(hourly["file_date"]).date <= last_day]
+
+    new_ids = hourly["station_id"].to_numpy(dtype=np.int64)
+    station_ids = np.union1d(tensor.station_ids, new_ids)
+    size = len(station_ids) * HOURS_PER_WEEK
+
+    sums = np.zeros((len(station_ids), HOURS_PER_WEEK), dtype=np.float32)
+    counts = np.zeros((len(station_ids), HOURS_PER_WEEK), dtype=np.uint32)
+    known = np.searchsorted(station_ids, tensor.station_ids)
+    sums[known] = tensor.sums
+    counts[known] = tensor.counts
+
+    cells = np.searchsorted(station_ids, new_ids) * HOURS_PER_WEEK + hour_of_week(hourly["file_date"])
+    values = hourly["nb_available"].to_numpy(dtype=np.float64)
+    sums += np.bincount(cells, weights=values, minlength=size).reshape(sums.shape).astype(np.float32)
+    counts += np.bincount(cells, minlength=size).reshape(counts.shape).astype(np.uint32)
+
+    return OccupancyTensor(
+        station_ids=station_ids,
+        sums=sums,
+        counts=np.minimum(counts, COUNT_MAX).astype(np.uint16),
+        last_day=last_day,
+    )
+
+
+def save(tensor: OccupancyTensor, directory: Path = DATA_DIR):
+    """Écrit le tenseur ; chaque fichier est remplacé d'un bloc (os.replace)."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in ("station_ids", "sums", "counts"):
+        tmp = directory / f"{name}.tmp.npy"
+        np.save(tmp, getattr(tensor, name))
+        os.replace(tmp, directory / f"{name}.npy")
+    meta = {"last_day": tensor.last_day.isoformat() if tensor.last_day else None, "timezone": TIMEZONE}
+    tmp = directory / "meta.tmp.json"
+    tmp.write_text(json.dumps(meta))
+    os.replace(tmp, directory / "meta.json")
+
+
+def load(directory: Path = DATA_DIR, mmap: bool = True) -> OccupancyTensor:
+    """Relit le tenseur (en lecture seule si `mmap`) ; tenseur vide s'il n'existe pas."""
+    directory = Path(directory)
+    if not (directory / "meta.json").exists():
+        return empty()
+    mode = "r" if mmap else None
+    meta = json.loads((directory / "meta.json").read_text())
+    return OccupancyTensor(
+        station_ids=np.load(directory / "station_ids.npy"),
+        sums=np.load(directory / "sums.npy", mmap_mode=mode),
+        counts=np.load(directory / "counts.npy", mmap_mode=mode),
+        last_day=date.fromisoformat(meta["last_day"]) if meta["last_day"] else None,
+    )
+
+
+def station_index(tensor: OccupancyTensor, station_ids) -> np.ndarray:
+    """Lignes du tenseur des stations demandées (les inconnues sont ignorées)."""
+    station_ids = np.asarray(station_ids, dtype=np.int64)
+    idx = np.searchsorted(tensor.station_ids, station_ids)
+    idx = np.minimum(idx, max(len(tensor.station_ids) - 1, 0))
+    known = (tensor.station_ids[idx] == station_ids) if len(tensor.station_ids) else np.zeros(len(idx), dtype=bool)
+    return idx[known]
+
+
+@instrumented()
+def fill_ratio(tensor: OccupancyTensor, station_ids, capacity) -> np.ndarray:
+    """Taux de remplissage (vélos / capacité) par créneau, pour un ensemble de stations.
+
+    `capacity` est alignée sur `station_ids`. Dans chaque créneau, seules les
+    stations observées comptent, au numérateur comme au dénominateur.
+    Renvoie 168 valeurs (NaN si aucune station observée).
+    """
+    station_ids = np.asarray(station_ids, dtype=np.int64)
+    capacity = pd.Series(np.asarray(capacity, dtype=np.float64), index=station_ids)
+    idx = station_index(tensor, station_ids)
+    cap = capacity.reindex(tensor.station_ids[idx]).to_numpy()[:, None]
+
+    counts = np.asarray(tensor.counts[idx], dtype=np.float64)
+    observed = counts > 0
+    mean_bikes = np.divide(tensor.sums[idx], counts, out=np.zeros_like(counts), where=observed)
+    bikes = mean_bikes.sum(axis=0)
+    total_capacity = (observed * cap).sum(axis=0)
+    return np.divide(bikes, total_capacity, out=np.full(HOURS_PER_WEEK, np.nan), where=total_capacity > 0)
+
+
+def as_week(values: np.ndarray) -> pd.DataFrame:
+    """168 valeurs -> tableau jours × heures."""
+    return pd.DataFrame(np.asarray(values).reshape(7, 24), index=DAYS, columns=range(24))
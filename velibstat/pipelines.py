@@ -0,0 +1,283 @@
+"""Calculs de chaque page, sans dépendance à Streamlit.
+
+Chaque fonction prend des données déjà chargées (payloads GBFS, tables
+BigQuery) et renvoie un objet typé que la page n'a plus qu'à afficher. Les
+mêmes fonctions servent aux traitements hors ligne et au banc de mesure.
+"""
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+import pandas as pd
+
+from velibstat import forecast, gbfs, geo, history, hotspots, network, occupancy, quality, trips
+from velibstat.instrumentation import instrumented
+
+
+# ----------------------------------------------------
+# Stations temps réel (toutes les pages GBFS)
+# ----------------------------------------------------
+@dataclass
+class LiveStations:
+    status: pd.DataFrame
+    info: pd.DataFrame
+    stations: pd.DataFrame  # status + info fusionnés
+    last_updated: datetime
+    info_version: int  # horodatage de station_information
+
+
+@instrumented()
+def live_stations(status_payload: dict, info_payload: dict) -> LiveStations:
+    df_status = gbfs.normalize_status(status_payload)
+    df_info = gbfs.normalize_information(info_payload)
+    return LiveStations(
+        status=df_status,
+        info=df_info,
+        stations=gbfs.merge_status_information(df_status, df_info),
+        last_updated=datetime.fromtimestamp(gbfs.last_updated(status_payload)),
+        info_version=gbfs.last_updated(info_payload),
+    )
+
+
+# ----------------------------------------------------
+# Home.py
+# ----------------------------------------------------
+@dataclass
+class HomeData:
+    live: LiveStations
+    totals: network.NetworkTotals
+
+
+@instrumented()
+def home(live: LiveStations) -> HomeData:
+    return HomeData(live=live, totals=network.network_totals(live.status, live.info))
+
+
+# ----------------------------------------------------
+# Ville.py
+# ----------------------------------------------------
+@dataclass
+class VilleData:
+    stations: pd.DataFrame   # avec departement_code et ville
+    unlocated: pd.DataFrame  # stations hors de toute commune connue
+    metrics: pd.DataFrame    # métriques par département
+    last_updated: datetime
+
+
+@instrumented()
+def locate(stations: pd.DataFrame, communes: list) -> pd.DataFrame:
+    df = stations.copy()
+    df[["departement_code", "ville"]] = geo.locate_stations(df["lon"], df["lat"], communes).to_numpy()
+    return df
+
+
+@instrumented()
+def ville(live: LiveStations, communes: list) -> VilleData:
+    df = locate(live.stations, communes)
+    return VilleData(
+        stations=df,
+        unlocated=df[df["departement_code"].isna() | df["ville"].isna()],
+        metrics=network.departement_metrics(df),
+        last_updated=live.last_updated,
+    )
+
+
+def cities(stations: pd.DataFrame, dep_code: str) -> list:
+    """Villes d'un département, arrondissements dans l'ordre numérique."""
+    villes_unique = stations[stations["departement_code"]==dep_code]["ville"].unique()
+    return sorted(
+        villes_unique,
+        key=lambda x: int(''.join(filter(str.isdigit, x))) if any(c.isdigit() for c in x) else 0
+    )
+
+
+def filter_area(stations: pd.DataFrame, dep_code: str, city: str = None) -> pd.DataFrame:
+    stations_filtrees = stations[stations["departement_code"]==dep_code]
+    if city is not None:
+        stations_filtrees = stations_filtrees[stations_filtrees["ville"]==city]
+    return stations_filtrees
+
+
+# ----------------------------------------------------
+# Station.py
+# ----------------------------------------------------
+def station_labels(stations: pd.DataFrame) -> dict:
+    """Code station (identifiant BigQuery) -> nom affiché."""
+    codes = gbfs.station_codes(stations, "stationCode_info")
+    return dict(zip(codes, stations.loc[codes.index, "name"]))
+
+
+@instrumented()
+def station_comparison(df_hist: pd.DataFrame, labels: dict, freq: str) -> dict:
+    """Séries alignées par station pour chaque indicateur de l'historique."""
+    df_hist = df_hist.assign(nb_total=df_hist["nb_bike"] + df_hist["nb_ebike"])
+    columns = ["nb_total", "nb_bike", "nb_ebike", "nb_bike_blocked_to_fix", "nb_bike_blocked_to_collect"]
+    return {column: history.align_histories(df_hist, column, labels, freq) for column in columns}
+
+
+@instrumented()
+def station_forecasts(model: forecast.ForecastModel, stations: pd.DataFrame, now, horizon_min: float) -> pd.DataFrame:
+    """Prévision pour chaque station ayant un code numérique, index conservé."""
+    codes = gbfs.station_codes(stations, "stationCode_info")
+    current = stations.loc[codes.index, "num_bikes_available"]
+    df = forecast.predict(model, codes, current, now, horizon_min)
+    df.index = codes.index
+    df["name"] = stations.loc[codes.index, "name"]
+    df["num_bikes_available"] = current
+    return df
+
+
+# ----------------------------------------------------
+# Occupancy.py
+# ----------------------------------------------------
+@instrumented()
+def occupancy_heatmap(tensor: occupancy.OccupancyTensor, stations: pd.DataFrame) -> pd.DataFrame:
+    """Taux de remplissage moyen des stations données, jours × heures."""
+    codes = gbfs.station_codes(stations, "stationCode_info")
+    ratio = occupancy.fill_ratio(tensor, codes, stations.loc[codes.index, "capacity"])
+    return occupancy.as_week(ratio)
+
+
+# ----------------------------------------------------
+# Generic_stats.py
+# ----------------------------------------------------
+@dataclass
+class TripDashboard:
+    bike_counts: pd.DataFrame
+    longest_trip: pd.Series
+    stations: pd.DataFrame
+    trips_per_day: pd.DataFrame
+    distance_per_day: pd.DataFrame
+    total_trips: pd.Series
+    total_distance: pd.Series
+    median_speed_type: pd.Series
+    hourly_profile: pd.Series
+    duration_dist: pd.Series
+    avg_duration: float
+    median_duration: float
+    avg_distance: float
+    median_distance: float
+    avg_speed: float
+    median_speed: float
+    short_trips_share: float
+    station_pairs: pd.DataFrame
+    excluded: pd.Series = None  # trajets écartés par règle qualité, sur la période
+
+
+@instrumented()
+def trip_dashboard(df_trips: pd.DataFrame, days: int, now=None, flags: pd.DataFrame = None) -> TripDashboard:
+    """Indicateurs de la période ; avec `flags` (quality.flag_trips), sans les
+    trajets signalés."""
+    df = trips.filter_period(df_trips, days, now)
+    excluded = None
+    if flags is not None:
+        period_flags = flags.loc[df.index]
+        excluded = quality.summary(period_flags)
+        df = df[quality.valid_mask(period_flags)]
+    trips_per_day, distance_per_day = trips.daily_by_type(df)
+    total_trips, total_distance, median_speed_type = trips.type_comparison(df)
+    return TripDashboard(
+        bike_counts=trips.bike_counts(df),
+        longest_trip=trips.longest_trip(df, "duration_min"),
+        stations=trips.station_activity(df),
+        trips_per_day=trips_per_day,
+        distance_per_day=distance_per_day,
+        total_trips=total_trips,
+        total_distance=total_distance,
+        median_speed_type=median_speed_type,
+        hourly_profile=trips.hourly_profile(df),
+        duration_dist=trips.duration_distribution(df),
+        avg_duration=df["duration_min"].mean(),
+        median_duration=df["duration_min"].median(),
+        avg_distance=df["distance_km"].mean(),
+        median_distance=df["distance_km"].median(),
+        avg_speed=df["avg_speed_kmh"].mean(),
+        median_speed=df["avg_speed_kmh"].median(),
+        short_trips_share=100 * (df["duration_min"] < 5).sum() / df.shape[0],
+        station_pairs=trips.station_pairs(df),
+        excluded=excluded,
+    )
+
+
+# ----------------------------------------------------
+# TopVelib.py
+# ----------------------------------------------------
+@dataclass
+class TopVelibData:
+    top_bike: pd.Series
+    longest_trip: pd.Series
+    longest_trip_map: pd.DataFrame
+
+
+@instrumented()
+def top_velib(df_trips: pd.DataFrame, df_dim_station: pd.DataFrame, flags: pd.DataFrame = None) -> TopVelibData:
+    if flags is not None:
+        df_trips = df_trips[quality.valid_mask(flags)]
+    df = trips.add_station_coordinates(df_trips, df_dim_station)
+    longest = trips.longest_trip(df, "distance_km")
+    return TopVelibData(
+        top_bike=trips.bike_counts(df).iloc[0],
+        longest_trip=longest,
+        longest_trip_map=pd.DataFrame([
+            {"lat": longest['start_lat'], "lon": longest['start_lon'], "station": "Départ"},
+            {"lat": longest['end_lat'], "lon": longest['end_lon'], "station": "Arrivée"}
+        ]),
+    )
+
+
+# ----------------------------------------------------
+# Rebalancing.py
+# ----------------------------------------------------
+@instrumented()
+def rebalancing_stations(live: LiveStations) -> pd.DataFrame:
+    """Stations en service, identifiées par leur code (comme dans BigQuery)."""
+    df = live.stations
+    df = df[df["is_installed"] == 1]
+    codes = gbfs.station_codes(df, "stationCode_info")
+    df = df.loc[codes.index, ["num_bikes_available", "num_docks_available", "name", "capacity", "lat", "lon"]]
+    df.insert(0, "station_id", codes)
+    return df
+
+
+@instrumented()
+def rebalancing_ranking(state: hotspots.HotspotState, stations: pd.DataFrame, flows: pd.DataFrame, days: int) -> pd.DataFrame:
+    ranking = hotspots.rank_hotspots(state, stations, flows, days)
+    return ranking.merge(stations[["station_id", "lat", "lon"]], on="station_id")
+
+
+# ----------------------------------------------------
+# Systems.py
+# ----------------------------------------------------
+@dataclass
+class SystemsData:
+    summary: pd.DataFrame  # une ligne par système, totaux du réseau
+    live: dict             # system_id -> LiveStations
+    errors: dict           # system_id -> message
+
+
+@instrumented()
+def systems(payloads: dict, registry: dict, errors: dict = None) -> SystemsData:
+    """Totaux côte à côte de plusieurs systèmes GBFS.
+
+    `payloads` associe à chaque system_id ses flux `station_status` et
+    `station_information`. Les systèmes dont les flux ne suivent pas le
+    format attendu passent dans `errors`.
+    """
+    errors = dict(errors or {})
+    rows, live = [], {}
+    for system_id, feeds in payloads.items():
+        try:
+            live[system_id] = live_stations(feeds["station_status"], feeds["station_information"])
+            totals = network.network_totals(live[system_id].status, live[system_id].info)
+        except KeyError as exc:
+            live.pop(system_id, None)
+            errors[system_id] = f"colonne absente : {exc}"
+            continue
+        system = registry[system_id]
+        rows.append({
+            "system_id": system_id,
+            "name": system.name,
+            "location": system.location,
+            **asdict(totals),
+            "last_updated": live[system_id].last_updated,
+        })
+    return SystemsData(summary=pd.DataFrame(rows), live=live, errors=errors)
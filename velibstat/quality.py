@@ -0,0 +1,87 @@
+"""Contrôle qualité des trajets (fact_velib_trips).
+
+Les trajets douteux ne sont pas supprimés mais signalés : `flag_trips` renvoie
+un masque booléen par règle, aligné sur l'index des trajets, à calculer une
+fois par chargement. Les agrégations choisissent ensuite de les écarter
+(`valid_mask`) et peuvent afficher combien l'ont été (`summary`).
+
+Règles, toutes vectorisées :
+
+- duration : durée hors de [min_duration_min, max_duration_min] (faux
+  départs, vélos oubliés ou mal raccrochés) ;
+- speed : vitesse moyenne au-delà de max_speed_kmh ;
+- distance : distance au-delà de max_distance_km ;
+- loop : retour à la station de départ sans distance mesurée ;
+- duplicate : même vélo, même heure de départ qu'un trajet précédent.
+
+Une règle dont les colonnes manquent (chargement partiel) est ignorée.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from velibstat.instrumentation import instrumented
+
+RULES = ["duration", "speed", "distance", "loop", "duplicate"]
+
+LABELS = {
+    "duration": "Durée aberrante",
+    "speed": "Vitesse aberrante",
+    "distance": "Distance aberrante",
+    "loop": "Boucle sans distance",
+    "duplicate": "Doublon",
+}
+
+
+@dataclass(frozen=True)
+class QualityRules:
+    min_duration_min: float = 1.0
+    max_duration_min: float = 180.0
+    max_speed_kmh: float = 35.0
+    max_distance_km: float = 50.0
+    loop_max_distance_km: float = 0.0
+
+
+DEFAULT_RULES = QualityRules()
+
+
+def _has(df: pd.DataFrame, *columns) -> bool:
+    return all(column in df for column in columns)
+
+
+@instrumented()
+def flag_trips(df: pd.DataFrame, rules: QualityRules = DEFAULT_RULES) -> pd.DataFrame:
+    """Une colonne booléenne par règle (True = trajet douteux), index conservé."""
+    no_flag = np.zeros(len(df), dtype=bool)
+    flags = {rule: no_flag for rule in RULES}
+
+    if _has(df, "duration_min"):
+        duration = df["duration_min"].to_numpy(dtype=np.float64)
+        flags["duration"] = (duration < rules.min_duration_min) | (duration > rules.max_duration_min)
+
+    if _has(df, "duration_min", "distance_km"):
+        distance = df["distance_km"].to_numpy(dtype=np.float64)
+        hours = df["duration_min"].to_numpy(dtype=np.float64) / 60
+        speed = np.divide(distance, hours, out=np.zeros_like(distance), where=hours > 0)
+        flags["speed"] = speed > rules.max_speed_kmh
+        flags["distance"] = distance > rules.max_distance_km
+
+    if _has(df, "start_station_id", "end_station_id", "distance_km"):
+        same_station = (df["start_station_id"] == df["end_station_id"]).to_numpy()
+        flags["loop"] = same_station & (df["distance_km"].to_numpy() <= rules.loop_max_distance_km)
+
+    if _has(df, "bike_id", "start_time"):
+        flags["duplicate"] = df.duplicated(["bike_id", "start_time"]).to_numpy()
+
+    return pd.DataFrame(flags, index=df.index)
+
+
+def valid_mask(flags: pd.DataFrame) -> pd.Series:
+    """True pour les trajets qui ne sont signalés par aucune règle."""
+    return ~flags.any(axis=1)
+
+
+def summary(flags: pd.DataFrame) -> pd.Series:
+    """Nombre de trajets signalés par règle (un trajet peut l'être plusieurs fois)."""
+    return flags.sum().rename(LABELS)
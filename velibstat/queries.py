@@ -0,0 +1,160 @@
+"""Requêtes BigQuery sur les tables velib_bronze.
+
+Chaque fonction reçoit le client en paramètre : la mise en cache reste à la
+charge de l'appelant (pages Streamlit, traitements hors ligne).
+"""
+from google.cloud import bigquery
+from google.oauth2 import service_account
+
+from velibstat.instrumentation import stage
+
+DATASET = "projet-velib-474009.velib_bronze"
+TABLE_TRIPS = f"`{DATASET}.fact_velib_trips`"
+TABLE_STATION_STATUS = f"`{DATASET}.fact_station_status`"
+TABLE_DIM_STATION = f"`{DATASET}.dim_station`"
+
+TRIP_COLUMNS = [
+    "bike_id",
+    "is_electric",
+    "start_station_id",
+    "start_station_name",
+    "end_station_id",
+    "end_station_name",
+    "start_time",
+    "end_time",
+    "duration_sec",
+    "duration_min",
+    "distance_km",
+    "avg_speed_kmh",
+]
+
+
+def make_client(service_account_info: dict) -> bigquery.Client:
+    credentials = service_account.Credentials.from_service_account_info(service_account_info)
+    return bigquery.Client(credentials=credentials, project=credentials.project_id)
+
+
+def run_query(client: bigquery.Client, name: str, query: str, job_config=None):
+    """Exécute la requête ; mesurée avec les octets lus et l'usage du cache BigQuery."""
+    with stage(f"bigquery.{name}") as record:
+        job = client.query(query, job_config=job_config)
+        df = job.to_dataframe()
+        if record is not None:
+            record.rows = len(df)
+            record.extra["bytes_processed"] = job.total_bytes_processed
+            record.extra["cache_hit"] = job.cache_hit
+    return df
+
+
+def load_trips(client: bigquery.Client, days: int, columns=TRIP_COLUMNS):
+    """Trajets commencés dans les `days` derniers jours."""
+    query = f"""
+        SELECT
+            {", ".join(columns)}
+        FROM {TABLE_TRIPS}
+        WHERE start_time >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {int(days)} DAY)
+    """
+    return run_query(client, "trips", query)
+
+
+def load_dim_station(client: bigquery.Client):
+    query = f"""
+    SELECT station_id, station_name, latitude, longitude
+    FROM {TABLE_DIM_STATION}
+    """
+    return run_query(client, "dim_station", query)
+
+
+def load_stations_history(client: bigquery.Client, station_ids, days: int):
+    """Relevés fact_station_status des stations demandées, en une seule requête."""
+    query = f"""
+    SELECT 
+        station_id,
+        file_date, 
+        nb_bike,
+        nb_ebike,
+        nb_bike_blocked_to_collect,
+        nb_bike_blocked_to_fix
+    FROM {TABLE_STATION_STATUS}
+    WHERE station_id IN UNNEST(@station_ids)
+      AND file_date >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {int(days)} DAY)
+    ORDER BY station_id, file_date
+    """
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[bigquery.ArrayQueryParameter("station_ids", "INT64", [int(i) for i in station_ids])]
+    )
+    return run_query(client, "stations_history", query, job_config=job_config)
+
+
+def load_hourly_availability(client: bigquery.Client, days: int):
+    """Vélos disponibles par station et par heure (entraînement de la prévision)."""
+    query = f"""
+    SELECT
+        station_id,
+        TIMESTAMP_TRUNC(file_date, HOUR) AS file_date,
+        AVG(nb_bike + nb_ebike) AS nb_available,
+        AVG(IF(nb_bike + nb_ebike > 0, 1, 0)) AS has_bike
+    FROM {TABLE_STATION_STATUS}
+    WHERE file_date >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {int(days)} DAY)
+    GROUP BY station_id, file_date
+    """
+    return run_query(client, "hourly_availability", query)
+
+
+def load_hourly_availability_range(client: bigquery.Client, start, end):
+    """Vélos disponibles par station et par heure, du jour `start` au jour `end`
+    inclus (dates en heure de Paris)."""
+    query = f"""
+    SELECT
+        station_id,
+        TIMESTAMP_TRUNC(file_date, HOUR) AS file_date,
+        AVG(nb_bike + nb_ebike) AS nb_available
+    FROM {TABLE_STATION_STATUS}
+    WHERE DATE(file_date, "Europe/Paris") BETWEEN @start AND @end
+    GROUP BY station_id, file_date
+    """
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter("start", "DATE", start),
+            bigquery.ScalarQueryParameter("end", "DATE", end),
+        ]
+    )
+    return run_query(client, "hourly_availability_range", query, job_config=job_config)
+
+
+def load_snapshot_counts(client: bigquery.Client, days: int):
+    """Nombre de relevés par station et par nombre de vélos disponibles."""
+    query = f"""
+    SELECT
+        station_id,
+        nb_bike + nb_ebike AS nb_available,
+        COUNT(*) AS nb_snapshots
+    FROM {TABLE_STATION_STATUS}
+    WHERE file_date >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {int(days)} DAY)
+    GROUP BY station_id, nb_available
+    """
+    return run_query(client, "snapshot_counts", query)
+
+
+def load_station_flows(client: bigquery.Client, days: int):
+    """Départs et arrivées par station sur les `days` derniers jours."""
+    query = f"""
+    WITH trips AS (
+        SELECT start_station_id, end_station_id
+        FROM {TABLE_TRIPS}
+        WHERE start_time >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {int(days)} DAY)
+    ),
+    station_out AS (
+        SELECT start_station_id AS station_id, COUNT(*) AS nb_out FROM trips GROUP BY station_id
+    ),
+    station_in AS (
+        SELECT end_station_id AS station_id, COUNT(*) AS nb_in FROM trips GROUP BY station_id
+    )
+    SELECT
+        COALESCE(o.station_id, i.station_id) AS station_id,
+        IFNULL(i.nb_in, 0) AS nb_in,
+        IFNULL(o.nb_out, 0) AS nb_out
+    FROM station_out o
+    FULL OUTER JOIN station_in i ON o.station_id = i.station_id
+    """
+    return run_query(client, "station_flows", query)
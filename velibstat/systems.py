@@ -0,0 +1,197 @@
+"""Registre des systèmes GBFS et récupération concurrente de leurs flux.
+
+Chaque système n'est décrit que par son URL d'auto-découverte (`gbfs.json`) :
+les URL de station_status / station_information en sont déduites. Le
+registre intégré peut être complété par un fichier au format `systems.csv`
+de MobilityData (variable d'environnement VELIBSTAT_SYSTEMS_CSV).
+
+`SystemFetcher` interroge tous les systèmes en parallèle (un thread par
+requête, session HTTP partagée), garde chaque flux en cache selon son `ttl`
+et espace les nouvelles tentatives d'un système en erreur (backoff
+exponentiel), en servant entre-temps la dernière réponse valide.
+"""
+import csv
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from velibstat import gbfs, instrumentation
+from velibstat.instrumentation import stage
+
+SYSTEMS_CSV_ENV = "VELIBSTAT_SYSTEMS_CSV"
+
+FEEDS = ("station_status", "station_information")
+
+# Durée de cache maximale par flux, quel que soit le ttl annoncé
+MAX_AGE = {"gbfs": 60 * 60, "station_information": 60 * 60, "station_status": 60}
+MIN_AGE = 10
+
+BACKOFF_BASE = 5
+BACKOFF_MAX = 10 * 60
+
+
+@dataclass(frozen=True)
+class System:
+    system_id: str
+    name: str
+    location: str
+    gbfs_url: str
+
+
+DEFAULT_SYSTEM = "velib"
+
+SYSTEMS = {s.system_id: s for s in [
+    System("velib", "Vélib' Métropole", "Paris, FR", gbfs.URL_GBFS),
+    System("bixi_MTL", "BIXI Montréal", "Montréal, CA", "https://gbfs.velobixi.com/gbfs/gbfs.json"),
+    System("citibike", "Citi Bike", "New York, US", "https://gbfs.citibikenyc.com/gbfs/gbfs.json"),
+    System("divvy", "Divvy", "Chicago, US", "https://gbfs.divvybikes.com/gbfs/gbfs.json"),
+    System("bay_wheels", "Bay Wheels", "San Francisco, US", "https://gbfs.baywheels.com/gbfs/gbfs.json"),
+    System("cabi", "Capital Bikeshare", "Washington, US", "https://gbfs.capitalbikeshare.com/gbfs/gbfs.json"),
+]}
+
+
+def load_systems_csv(path: str) -> dict:
+    """Systèmes d'un fichier au format systems.csv de MobilityData."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    return {
+        row["System ID"]: System(row["System ID"], row["Name"], row.get("Location", ""), row["Auto-Discovery URL"])
+        for row in rows
+        if row.get("Auto-Discovery URL")
+    }
+
+
+def registry() -> dict:
+    """Registre intégré, complété par VELIBSTAT_SYSTEMS_CSV s'il est défini."""
+    systems = dict(SYSTEMS)
+    path = os.environ.get(SYSTEMS_CSV_ENV)
+    if path:
+        systems.update(load_systems_csv(path))
+    return systems
+
+
+def discover_feeds(payload: dict, language: str = "fr") -> dict:
+    """gbfs.json -> {nom du flux: URL}.
+
+    En v1/v2 les flux sont regroupés par langue (`language` si présente,
+    sinon la première) ; en v3 ils sont directement sous `data`.
+    """
+    data = payload.get("data", {})
+    if "feeds" in data:
+        feeds = data["feeds"]
+    else:
+        lang = language if language in data else next(iter(data), None)
+        feeds = data[lang]["feeds"] if lang is not None else []
+    return {feed["name"]: feed["url"] for feed in feeds}
+
+
+def max_age(payload: dict, feed: str) -> float:
+    """Durée de validité d'un flux : son `ttl`, borné par MIN_AGE et MAX_AGE."""
+    ttl = payload.get("ttl") or 0
+    return min(max(ttl, MIN_AGE), MAX_AGE.get(feed, MIN_AGE))
+
+
+@dataclass
+class _Entry:
+    payload: dict = None
+    expires: float = 0.0
+    failures: int = 0
+    retry_at: float = 0.0
+    error: Exception = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+@dataclass
+class FetchResult:
+    payloads: dict  # system_id -> {flux: payload}
+    errors: dict    # system_id -> message, pour les systèmes sans données
+
+
+class SystemFetcher:
+    """Flux GBFS de plusieurs systèmes, avec cache et backoff par système et par flux."""
+
+    def __init__(self, systems: dict = None, max_workers: int = 16, timeout: float = 10):
+        self.systems = registry() if systems is None else systems
+        self.timeout = timeout
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        # Mesures désactivées dans les threads de travail : leurs étapes
+        # gbfs.fetch iraient dans des listes propres à chaque thread, jamais
+        # affichées ni vidées. Seule l'étape systems.fetch_all est mesurée.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="gbfs",
+            initializer=instrumentation.start_run, initargs=(False,),
+        )
+        self._entries = {}
+        self._entries_lock = threading.Lock()
+
+    def _entry(self, system_id: str, feed: str) -> _Entry:
+        with self._entries_lock:
+            return self._entries.setdefault((system_id, feed), _Entry())
+
+    def _url(self, system_id: str, feed: str) -> str:
+        if feed == "gbfs":
+            return self.systems[system_id].gbfs_url
+        feeds = discover_feeds(self.feed(system_id, "gbfs"))
+        if feed not in feeds:
+            raise KeyError(f"{system_id} : flux {feed} absent de gbfs.json")
+        return feeds[feed]
+
+    def feed(self, system_id: str, feed: str) -> dict:
+        """Un flux d'un système : depuis le cache s'il est encore valide.
+
+        En cas d'échec, la dernière réponse valide est renvoyée si elle existe
+        et le système n'est plus interrogé avant la fin du backoff.
+        """
+        entry = self._entry(system_id, feed)
+        # Un seul appel réseau à la fois par flux : les autres attendent le cache
+        with entry.lock:
+            now = time.monotonic()
+            if entry.payload is not None and now < entry.expires:
+                return entry.payload
+            if now < entry.retry_at:
+                if entry.payload is not None:
+                    return entry.payload
+                raise entry.error
+
+            try:
+                payload = gbfs.fetch(self._url(system_id, feed), self.timeout, self._session)
+            except (requests.RequestException, ValueError, KeyError) as exc:
+                entry.failures += 1
+                entry.retry_at = now + min(BACKOFF_BASE * 2 ** (entry.failures - 1), BACKOFF_MAX)
+                entry.error = exc
+                if entry.payload is not None:
+                    return entry.payload
+                raise
+
+            entry.payload = payload
+            entry.expires = now + max_age(payload, feed)
+            entry.failures = 0
+            entry.retry_at = 0.0
+            entry.error = None
+            return payload
+
+    def fetch_all(self, system_ids, feeds=FEEDS) -> FetchResult:
+        """Tous les flux demandés, tous systèmes confondus, en parallèle."""
+        with stage("systems.fetch_all", systems=len(system_ids)):
+            futures = {
+                (system_id, feed): self._executor.submit(self.feed, system_id, feed)
+                for system_id in system_ids
+                for feed in feeds
+            }
+            payloads, errors = {}, {}
+            for (system_id, feed), future in futures.items():
+                try:
+                    payloads.setdefault(system_id, {})[feed] = future.result()
+                except Exception as exc:
+                    errors[system_id] = f"{feed} : {exc}"
+            for system_id in errors:
+                payloads.pop(system_id, None)
+        return FetchResult(payloads=payloads, errors=errors)
@@ -0,0 +1,136 @@
+"""Agrégations sur les trajets (fact_velib_trips)."""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from velibstat.instrumentation import instrumented
+
+
+@instrumented()
+def filter_period(df: pd.DataFrame, days: int, now=None) -> pd.DataFrame:
+    """Trajets commencés depuis minuit il y a `days` jours (UTC)."""
+    now = pd.Timestamp.now(tz=pytz.UTC) if now is None else pd.Timestamp(now)
+    start_date = now.normalize() - timedelta(days=days)
+    return df[df["start_time"] >= start_date]
+
+
+@instrumented()
+def bike_counts(df: pd.DataFrame) -> pd.DataFrame:
+    return (
+        df.groupby("bike_id")
+        .size()
+        .reset_index(name="nb_trips")
+        .sort_values("nb_trips", ascending=False)
+    )
+
+
+@instrumented()
+def longest_trip(df: pd.DataFrame, column: str = "duration_min") -> pd.Series:
+    return df.sort_values(column, ascending=False).iloc[0]
+
+
+@instrumented()
+def station_activity(df: pd.DataFrame) -> pd.DataFrame:
+    station_out = (
+        df.groupby(["start_station_id", "start_station_name"])
+        .size()
+        .reset_index(name="nb_out")
+    )
+
+    station_in = (
+        df.groupby(["end_station_id", "end_station_name"])
+        .size()
+        .reset_index(name="nb_in")
+    )
+
+    stations = (
+        station_out
+        .merge(
+            station_in,
+            left_on="start_station_id",
+            right_on="end_station_id",
+            how="outer"
+        )
+        .fillna(0)
+    )
+
+    stations["total_activity"] = stations["nb_out"] + stations["nb_in"]
+    return stations
+
+
+@instrumented()
+def daily_by_type(df: pd.DataFrame):
+    """Trajets et distance totale par jour, élec vs méca."""
+    date = df["start_time"].dt.date.rename("date")
+
+    trips_per_day = (
+        df.groupby([date, "is_electric"])
+        .size()
+        .unstack(fill_value=0)
+    )
+
+    distance_per_day = (
+        df.groupby([date, "is_electric"])["distance_km"]
+        .sum()
+        .unstack(fill_value=0)
+    )
+    return trips_per_day, distance_per_day
+
+
+@instrumented()
+def type_comparison(df: pd.DataFrame):
+    """Nombre de trajets, distance totale et vitesse médiane par type de vélo."""
+    total_trips = df["is_electric"].value_counts()
+    total_distance = df.groupby("is_electric")["distance_km"].sum()
+    median_speed_type = df.groupby("is_electric")["avg_speed_kmh"].median()
+    return total_trips, total_distance, median_speed_type
+
+
+@instrumented()
+def hourly_profile(df: pd.DataFrame) -> pd.Series:
+    return df.groupby(df["start_time"].dt.hour).size()
+
+
+@instrumented()
+def duration_distribution(df: pd.DataFrame) -> pd.Series:
+    duration_bins = pd.cut(
+        df["duration_min"],
+        bins=[0, 5, 15, 30, np.inf],
+        labels=["<5 min", "5–15 min", "15–30 min", ">30 min"]
+    )
+    return duration_bins.value_counts().sort_index()
+
+
+@instrumented()
+def station_pairs(df: pd.DataFrame) -> pd.DataFrame:
+    return (
+        df.groupby(["start_station_name", "end_station_name"])
+        .size()
+        .reset_index(name="nb_trips")
+        .sort_values("nb_trips", ascending=False)
+    )
+
+
+@instrumented()
+def add_station_coordinates(df_trips: pd.DataFrame, df_dim_station: pd.DataFrame) -> pd.DataFrame:
+    """Ajoute noms et coordonnées des stations de départ et d'arrivée."""
+    df_trips = df_trips.merge(
+        df_dim_station.rename(columns={
+            "station_id": "start_station_id",
+            "station_name": "start_station_name",
+            "latitude": "start_lat",
+            "longitude": "start_lon"
+        }), on="start_station_id", how="left"
+    )
+
+    df_trips = df_trips.merge(
+        df_dim_station.rename(columns={
+            "station_id": "end_station_id",
+            "station_name": "end_station_name",
+            "latitude": "end_lat",
+            "longitude": "end_lon"
+        }), on="end_station_id", how="left"
+    )
+    return df_trips